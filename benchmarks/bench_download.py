@@ -0,0 +1,52 @@
+"""Compare single-stream and segmented downloads against a local HTTP server.
+
+The server caps every connection at --bandwidth bytes/s and adds --latency
+seconds per request to mimic a high-latency link:
+
+    python benchmarks/bench_download.py --size 16 --segments 1 2 4 8
+"""
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / "tests"))
+
+from fake_github import FakeGitHub  # noqa: E402
+
+from terragrunt_env import download  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=16, help="asset size in MiB")
+    parser.add_argument("--bandwidth", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    server = FakeGitHub().start()
+    server.bandwidth = args.bandwidth
+    server.latency = args.latency
+    url = server.add_asset("/asset", os.urandom(args.size * 1024 * 1024))
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for segments in args.segments:
+                path = pathlib.Path(tmp) / f"terragrunt-{segments}"
+                start = time.perf_counter()
+                download.fetch(url, path, segments=segments)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"segments={segments:<3} {elapsed:7.2f}s "
+                    f"{args.size / elapsed:8.2f} MiB/s"
+                )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
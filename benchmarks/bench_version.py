@@ -0,0 +1,46 @@
+"""Time parsing and sorting a terragrunt-sized tag history.
+
+python benchmarks/bench_version.py --tags 1500
+"""
+
+import argparse
+import random
+import timeit
+
+from terragrunt_env import version
+
+
+def make_tags(count: int) -> list[str]:
+    tags = [f"v0.{minor}.{patch}" for minor in range(100) for patch in range(40)]
+    tags += [f"v0.{minor}.0-beta{n}" for minor in range(100) for n in range(1, 4)]
+    random.Random(0).shuffle(tags)
+    return tags[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    tags = make_tags(args.tags)
+
+    def cold(func):
+        def run():
+            version._intern.cache_clear()
+            func()
+
+        return run
+
+    cases = {
+        "parse (cold)": cold(lambda: version.Version.parse_many(tags)),
+        "parse (interned)": lambda: version.Version.parse_many(tags),
+        "sorted(Version)": cold(lambda: sorted(map(version.Version, tags))),
+        "sort_versions": cold(lambda: version.sort_versions(tags)),
+    }
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<18} {best * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
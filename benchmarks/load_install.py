@@ -0,0 +1,118 @@
+"""Install throughput and tail latency against a local fake GitHub.
+
+Every install resolves a distinct release (one HEAD), fetches its SHA256SUMS
+and binary and records it in the manifest, exactly like `tgenv install`.
+The server can add per-request latency, cap per-connection bandwidth, drop
+connections mid-body and answer a share of requests with an error:
+
+    python benchmarks/load_install.py --installs 64 --concurrency 1 4 16
+    python benchmarks/load_install.py --latency 0.05 --error-rate 0.05 --drops 8
+"""
+
+import argparse
+import math
+import pathlib
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import typer
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / "tests"))
+
+from fake_github import FakeGitHub  # noqa: E402
+
+from terragrunt_env import helper, remote, resolve, session  # noqa: E402
+from terragrunt_env.cache import Cache  # noqa: E402
+
+
+def _percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(p * len(ordered)) - 1, 0)]
+
+
+def _install(version: str) -> float | None:
+    start = time.perf_counter()
+    try:
+        v = helper.resolve_remote_version(version)
+        if v is None:
+            return None
+        helper.install_version(v)
+    except (typer.Exit, OSError):
+        return None
+    return time.perf_counter() - start
+
+
+def _run(
+    server: FakeGitHub, versions: List[str], size_mib: float, concurrency: int
+) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = pathlib.Path(tmp)
+        resolve.VERSIONS_DIR = tmp_path / "versions"
+        remote.RESOLUTION_CACHE = Cache(tmp_path / "resolve.json", ttl=3600)
+        errors, connections = server.errors, server.connections
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(_install, versions))
+        elapsed = time.perf_counter() - start
+
+    done = [r for r in results if r is not None]
+    size = len(done) * size_mib
+    if not done:
+        print(f"concurrency={concurrency:<3} all {len(results)} installs failed")
+        return
+    print(
+        f"concurrency={concurrency:<3} {len(done) / elapsed:7.1f} installs/s "
+        f"{size / elapsed:8.2f} MiB/s  "
+        f"p50 {_percentile(done, 0.5) * 1000:7.1f} ms  "
+        f"p95 {_percentile(done, 0.95) * 1000:7.1f} ms  "
+        f"p99 {_percentile(done, 0.99) * 1000:7.1f} ms  "
+        f"max {max(done) * 1000:7.1f} ms  "
+        f"failed {len(results) - len(done)}  "
+        f"injected {server.errors - errors}  "
+        f"connections {server.connections - connections}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--installs", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--size", type=float, default=1, help="binary size in MiB")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--drops", type=int, default=0, help="bodies cut short")
+    parser.add_argument("--backoff-base", type=float, default=0.1)
+    args = parser.parse_args()
+
+    server = FakeGitHub().start()
+    server.latency = args.latency
+    server.bandwidth = args.bandwidth
+    server.error_rate = args.error_rate
+    server.error_status = args.error_status
+    data = bytes(int(args.size * 2**20))
+    versions = [f"1.{i}.0" for i in range(args.installs)]
+    for v in versions:
+        server.publish(v, data)
+
+    source = remote.GitHubSource(server.repo_url, server.api_url)
+    remote.SOURCE = source
+    helper._OS = "linux"
+    helper.detect_arch = lambda: "amd64"
+    session.BACKOFF_BASE = args.backoff_base
+    try:
+        for concurrency in args.concurrency:
+            server.drops = args.drops
+            server.drop_after = len(data) // 2
+            _run(server, versions, args.size, concurrency)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
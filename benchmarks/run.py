@@ -0,0 +1,219 @@
+"""Microbenchmarks with a stored baseline and a regression threshold.
+
+    python benchmarks/run.py --save               # record benchmarks/baseline.json
+    python benchmarks/run.py                      # compare, exit 1 on regression
+    python benchmarks/run.py --threshold 0.25 -k version
+
+Each benchmark reports the best per-operation time over --repeat runs, which
+is the most stable statistic on shared CI machines. Baselines are machine
+specific: record one per runner type and point --baseline at it.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import threading
+import timeit
+from typing import Callable, Dict, Tuple
+
+from bench_version import make_tags
+
+from terragrunt_env import daemon, daemon_client, resolve, version
+
+BASELINE = pathlib.Path(__file__).with_name("baseline.json")
+_TMP = tempfile.TemporaryDirectory()
+
+Benchmark = Callable[[], Tuple[Callable[[], object], int]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def _cold(func: Callable[[], object]) -> Callable[[], object]:
+    def run() -> object:
+        version._intern.cache_clear()
+        return func()
+
+    return run
+
+
+@benchmark("version.parse")
+def bench_version_parse():
+    tags = make_tags(1500)
+    return _cold(lambda: version.Version.parse_many(tags)), len(tags)
+
+
+@benchmark("version.sort")
+def bench_version_sort():
+    tags = make_tags(1500)
+    return _cold(lambda: version.sort_versions(tags)), len(tags)
+
+
+@benchmark("version.sort.parsed")
+def bench_version_sort_parsed():
+    # Every tag, prereleases included, already parsed: only comparisons.
+    versions = version.Version.parse_many(make_tags(5000))
+    return lambda: sorted(versions), len(versions)
+
+
+@benchmark("version.compare")
+def bench_version_compare():
+    versions = version.Version.parse_many(make_tags(1500))
+    pairs = list(zip(versions, versions[1:]))
+    return lambda: [a < b for a, b in pairs], len(pairs)
+
+
+@benchmark("version.cmpkey")
+def bench_cmpkey():
+    versions = version.Version.parse_many(make_tags(1500))
+    parts = [(v._version.release, v._version.pre, None, None) for v in versions]
+    return lambda: [version._cmpkey(*p) for p in parts], len(parts)
+
+
+def _version_file_benchmark(depth: int, memo: bool) -> Benchmark:
+    def setup():
+        tmp = pathlib.Path(tempfile.mkdtemp(dir=_TMP.name))
+        directory = tmp.joinpath(*(f"d{i}" for i in range(depth)))
+        directory.mkdir(parents=True)
+        (tmp / resolve.VERSION_FILE_NAME).write_text("0.55.1\n")
+        resolve.VERSION_FILE_MEMO_DIR = tmp / "memo"
+        if memo:
+            resolve.find_version_file(directory)
+            return lambda: resolve.find_version_file(directory), 1
+        return lambda: resolve._walk_version_files(directory), 1
+
+    return setup
+
+
+for _depth in (1, 5, 10, 20):
+    benchmark(f"version_file.walk.depth{_depth}")(
+        _version_file_benchmark(_depth, memo=False)
+    )
+    benchmark(f"version_file.memo.depth{_depth}")(
+        _version_file_benchmark(_depth, memo=True)
+    )
+
+
+def _process(args, **env) -> Callable[[], object]:
+    tmp = tempfile.mkdtemp(dir=_TMP.name)
+    pathlib.Path(tmp, resolve.VERSION_FILE_NAME).write_text("0.0.0-bench\n")
+    env = {**os.environ, "HOME": tmp, "TGENV_DAEMON_SOCKET": "", **env}
+
+    def run():
+        subprocess.run(args, cwd=tmp, env=env, capture_output=True)
+
+    return run
+
+
+@benchmark("startup.python")
+def bench_startup_python():
+    return _process([sys.executable, "-c", "pass"]), 1
+
+
+@benchmark("startup.shim")
+def bench_startup_shim():
+    code = "from terragrunt_env.launcher import main; main()"
+    return _process([sys.executable, "-c", code]), 1
+
+
+def _daemon() -> Tuple[pathlib.Path, str]:
+    # A daemon in this process, serving a versions directory with one
+    # installed "binary" (a no-op shell script) pinned by the returned tree.
+    tmp = pathlib.Path(tempfile.mkdtemp(dir=_TMP.name))
+    resolve.VERSIONS_DIR = tmp / "versions"
+    resolve.VERSION_FILE_MEMO_DIR = tmp / "memo"
+    binary = resolve.get_version_path("0.0.0-bench")
+    binary.parent.mkdir(parents=True)
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+    (tmp / resolve.VERSION_FILE_NAME).write_text("0.0.0-bench\n")
+
+    socket_path = str(tmp / "daemon.sock")
+    server = daemon.Daemon(socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return tmp, socket_path
+
+
+@benchmark("resolve.direct")
+def bench_resolve_direct():
+    tmp, _ = _daemon()
+
+    def run():
+        v = resolve.get_version(directory=tmp)
+        assert v in resolve.get_manifest().load()
+        return resolve.get_version_path(v)
+
+    return run, 1
+
+
+@benchmark("resolve.daemon")
+def bench_resolve_daemon():
+    tmp, socket_path = _daemon()
+    return lambda: daemon_client.lookup(str(tmp), socket_path), 1
+
+
+@benchmark("startup.shim.daemon")
+def bench_startup_shim_daemon():
+    _, socket_path = _daemon()
+    code = "from terragrunt_env.launcher import main; main()"
+    return _process([sys.executable, "-c", code], TGENV_DAEMON_SOCKET=socket_path), 1
+
+
+def measure(setup: Benchmark, repeat: int) -> float:
+    func, ops = setup()
+    number, _ = timeit.Timer(func).autorange()
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number / ops
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store a new baseline")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("-k", dest="keyword", default="")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline.exists() and not args.save:
+        baseline = json.loads(args.baseline.read_text())
+
+    results, regressions = {}, []
+    for name, setup in BENCHMARKS.items():
+        if args.keyword not in name:
+            continue
+        results[name] = elapsed = measure(setup, args.repeat)
+        line = f"{name:<28} {elapsed * 1e6:12.3f} us"
+        if name in baseline:
+            ratio = elapsed / baseline[name]
+            line += f"  {ratio:6.2f}x baseline"
+            if ratio > 1 + args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) regressed by more than "
+            f"{args.threshold:.0%}: {', '.join(regressions)}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import hashlib
+import io
+import os
+import pathlib
+import tarfile
+from typing import IO, Dict, Iterable, List, Tuple
+
+from . import store
+from .download import BUFFER_SIZE, _hash_file, part_path
+from .helper import save_digest
+from .lock import FileLock
+from .manifest import Entry
+from .resolve import get_lock_path, get_manifest, get_version_path
+from .settings import _BIN_FILE_NAME
+from .version import InvalidVersion, Version
+
+MANIFEST_MEMBER = "manifest"
+HEX_DIGITS = frozenset("0123456789abcdef")
+COMPRESSIONS = ("", "gz", "bz2", "xz")
+
+
+class BundleError(Exception):
+    pass
+
+
+def export_bundle(
+    path: pathlib.Path, versions: Iterable[str], compression: str = ""
+) -> List[str]:
+    installed = get_manifest().load()
+    versions = list(versions) or sorted(installed, key=Version)
+    entries = []
+    for v in versions:
+        if v not in installed:
+            raise BundleError(f"Terragrunt version {v} is not installed.")
+        entry = installed[v]
+        if not entry.sha256:
+            entry.sha256 = _hash_file(get_version_path(v)).hexdigest()
+        entries.append(entry)
+
+    # The manifest goes first so that import can verify each binary while it
+    # streams past, without seeking back.
+    with tarfile.open(path, f"w:{compression}") as tar:
+        data = "".join(entry.format() + "\n" for entry in entries).encode()
+        info = tarfile.TarInfo(MANIFEST_MEMBER)
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        for entry in entries:
+            info = tar.gettarinfo(get_version_path(entry.version))
+            info.name = f"{entry.version}/{_BIN_FILE_NAME}"
+            info.uname = info.gname = ""
+            with open(get_version_path(entry.version), "rb") as f:
+                tar.addfile(info, f)
+    return [entry.version for entry in entries]
+
+
+def import_bundle(path: pathlib.Path) -> Tuple[List[str], List[str]]:
+    manifest = get_manifest()
+    expected: Dict[str, Entry] = {}
+    imported, skipped = [], []
+    with tarfile.open(path, "r|*") as tar:
+        for member in tar:
+            if member.name == MANIFEST_MEMBER:
+                expected = _read_manifest(tar.extractfile(member))
+                continue
+
+            version, _, name = member.name.partition("/")
+            entry = expected.get(version)
+            if entry is None or name != _BIN_FILE_NAME or not member.isfile():
+                raise BundleError(f"Unexpected member {member.name!r} in {path}")
+            installed = manifest.load().get(version)
+            if installed and installed.sha256 and installed.sha256 == entry.sha256:
+                skipped.append(version)
+                continue
+            _extract(tar.extractfile(member), version, entry.sha256)
+            imported.append(version)
+    return imported, skipped
+
+
+def _read_manifest(f: IO[bytes]) -> Dict[str, Entry]:
+    entries = {}
+    for line in f.read().decode().splitlines():
+        try:
+            entry = Entry.parse(line)
+            Version(entry.version)
+        except (ValueError, InvalidVersion):
+            raise BundleError(f"Invalid bundle manifest line: {line!r}")
+        # Every binary is verified against its digest, so one without a
+        # usable digest would be installed unchecked.
+        if len(entry.sha256) != 64 or not HEX_DIGITS.issuperset(entry.sha256):
+            raise BundleError(f"Invalid sha256 in bundle manifest line: {line!r}")
+        entries[entry.version] = entry
+    return entries
+
+
+def _extract(src: IO[bytes], version: str, sha256: str) -> None:
+    path = get_version_path(version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = part_path(path)
+    hasher = hashlib.sha256()
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with FileLock(get_lock_path(version)):
+        with open(tmp_path, "wb") as dst:
+            while n := src.readinto(buffer):
+                dst.write(view[:n])
+                hasher.update(view[:n])
+
+        digest = hasher.hexdigest()
+        if digest != sha256:
+            tmp_path.unlink()
+            raise BundleError(f"{version}: expected sha256 {sha256}, got {digest}")
+        tmp_path.chmod(0o755)
+        os.replace(tmp_path, path)
+        save_digest(path, digest)
+        store.publish(path, digest)
+        get_manifest().add(version, digest)
@@ -0,0 +1,61 @@
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Dict
+
+from . import tracing
+
+MISSING = object()
+
+
+class Cache:
+    def __init__(self, path: pathlib.Path, ttl: float) -> None:
+        self.path = path
+        self.ttl = ttl
+
+    def get(self, key: str, stale: bool = False) -> Any:
+        entry = self._load().get(key)
+        if entry is None:
+            result = "miss"
+        elif not stale and time.time() - entry["time"] >= self.ttl:
+            result = "expired"
+        else:
+            result = "stale" if stale else "hit"
+        tracing.incr("tgenv_cache_lookups_total", cache=self.path.stem, result=result)
+        return entry["value"] if result in ("hit", "stale") else MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        self.update({key: value})
+
+    def update(self, values: Dict[str, Any]) -> None:
+        data = self._load()
+        now = time.time()
+        for key, value in values.items():
+            data[key] = {"value": value, "time": now}
+        self._dump(data)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _dump(self, data: Dict[str, Dict[str, Any]]) -> None:
+        # Best effort: a read-only store, or a shared one whose cache
+        # directory belongs to another user, only costs the next lookup.
+        # Per thread as well as per process: prefetch resolves in a pool.
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path = self.path.with_name(f"{self.path.name}.{suffix}")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
@@ -1,16 +1,48 @@
+import pathlib
 import subprocess
 import sys
-from typing import Optional
+import tarfile
+import time
+import urllib.error
+from typing import List, Optional
 
 import typer
 
-from .helper import (VERSIONS_DIR, check_remote_version, download_version,
-                     get_remote_versions, get_version, get_version_from_file,
-                     get_version_path, is_version_installed, remove_version,
-                     set_execution_permission, use_version)
-from .version import Version
+from . import bundle, mirror, shell, tracing
+from .constraints import Constraint, InvalidConstraint
+from .helper import (_OS, PREFETCH_JOBS, TGENV_DAEMON_SOCKET,
+                     TGENV_GC_MAX_BYTES, TGENV_GC_MAX_COUNT, Entry,
+                     auto_collect_garbage, check_remote_version,
+                     collect_garbage, detect_arch, find_pinned_versions,
+                     get_manifest, get_remote_versions, get_version,
+                     get_version_from_file, get_version_path, install_version,
+                     is_version_installed, prefetch, remove_version,
+                     resolve_remote_version, set_offline, use_version)
+from .resolve import InvalidVersionFile
+from .version import Version, sort_versions
 
 app = typer.Typer(add_completion=False, no_args_is_help=True, name="tgenv")
+mirror_app = typer.Typer(no_args_is_help=True, help="Manage a release mirror.")
+app.add_typer(mirror_app, name="mirror")
+bundle_app = typer.Typer(
+    no_args_is_help=True, help="Move installed versions as one archive."
+)
+app.add_typer(bundle_app, name="bundle")
+
+
+@app.callback()
+def main(
+    trace: bool = typer.Option(
+        False, "--trace", help="Print timing spans as JSON lines to stderr."
+    ),
+    offline: bool = typer.Option(
+        False, "--offline", help="Resolve from installed versions; no network."
+    ),
+):
+    if trace:
+        tracing.enable()
+    if offline:
+        set_offline()
 
 
 @app.command(name="install")
@@ -19,24 +51,93 @@ def cmd_install(
         "latest", help="The version of Terragrun to install.", show_default=False
     )
 ):
-    v = check_remote_version(version)
+    try:
+        v = resolve_remote_version(version)
+    except urllib.error.URLError as e:
+        print(f"Looking up Terragrunt version {version} failed: {e.reason}")
+        raise typer.Exit(code=1)
     if v is None:
-        print(f"There is no version {v}")
+        print(f"There is no version {version}")
         raise typer.Exit(code=1)
     if is_version_installed(v):
         print(f"Terragrunt version {v} already installed.")
         raise typer.Exit(code=0)
-    else:
-        version_dir = VERSIONS_DIR / v
-        version_dir.mkdir(exist_ok=True)
 
     print(f"Installing Terragrunt version {v}...")
-    bin_file_path = download_version(v)
-    set_execution_permission(bin_file_path)
+    install_version(v)
 
     print(f"Installation of Terragrunt version {v} successful.")
 
     use_version(v, installation=True)
+    _report_evicted(auto_collect_garbage(keep=[v]))
+
+
+@app.command(name="prefetch")
+def cmd_prefetch(
+    path: pathlib.Path = typer.Argument(
+        pathlib.Path("."), help="Directory to scan for version files."
+    ),
+    jobs: int = typer.Option(PREFETCH_JOBS, "--jobs", "-j", min=1),
+):
+    pins = find_pinned_versions(path)
+    installed, present, failed = prefetch(pins, jobs)
+    _report_evicted(auto_collect_garbage(keep=installed + present))
+    print(
+        f"Prefetched {len(pins)} pinned version(s): {len(installed)} installed, "
+        f"{len(present)} already installed, {len(failed)} failed."
+    )
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command(name="gc")
+def cmd_gc(
+    max_bytes: int = typer.Option(
+        TGENV_GC_MAX_BYTES, help="Evict until installed binaries fit in this size."
+    ),
+    max_count: int = typer.Option(
+        TGENV_GC_MAX_COUNT, help="Evict until at most this many versions remain."
+    ),
+    dry_run: bool = typer.Option(False, help="Only print what would be evicted."),
+):
+    if not max_bytes and not max_count:
+        print("Set --max-bytes or --max-count (or TGENV_GC_MAX_BYTES/COUNT).")
+        raise typer.Exit(code=1)
+    evicted = collect_garbage(max_bytes, max_count, dry_run)
+    _report_evicted(evicted, dry_run)
+    freed = sum(entry.size for entry in evicted) / 2**20
+    verb = "Would free" if dry_run else "Freed"
+    print(f"{verb} {freed:.1f} MiB from {len(evicted)} version(s).")
+
+
+def _report_evicted(evicted: List[Entry], dry_run: bool = False) -> None:
+    for entry in evicted:
+        verb = "Would evict" if dry_run else "Evicted"
+        print(
+            f"{verb} Terragrunt version {entry.version} ({entry.size / 2**20:.1f} MiB)."
+        )
+
+
+@app.command(name="daemon")
+def cmd_daemon(
+    socket: str = typer.Option(
+        TGENV_DAEMON_SOCKET, help="Unix socket to listen on.", show_default=False
+    ),
+):
+    from .daemon import Daemon, DaemonError
+
+    try:
+        server = Daemon(socket)
+    except DaemonError as e:
+        print(e)
+        raise typer.Exit(code=1)
+    print(f"Listening on {socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 @app.command(name="use")
@@ -59,15 +160,84 @@ def cmd_uninstall(
 
 
 @app.command(name="list")
-def cmd_list():
-    for item in VERSIONS_DIR.iterdir():
-        if item.is_dir():
-            print(item.name)
+def cmd_list(
+    constraint: Optional[str] = typer.Argument(
+        None, help="Only list versions matching this constraint.", show_default=False
+    ),
+    long: bool = typer.Option(
+        False, "--long", "-l", help="Show size, install and last-used times."
+    ),
+):
+    entries = get_manifest().load()
+    versions = sort_versions(entries)
+    if constraint:
+        try:
+            c = Constraint(constraint)
+        except InvalidConstraint as e:
+            print(e)
+            raise typer.Exit(code=1)
+        versions = [v for v in versions if Version(v) in c]
+    for v in versions:
+        if not long:
+            print(v)
+            continue
+        entry = entries[v]
+        last_used = _format_time(entry.last_used) if entry.last_used else "never"
+        print(
+            f"{v:<20} {entry.size / 2**20:8.1f} MiB  "
+            f"installed {_format_time(entry.installed_at)}  last used {last_used}"
+        )
+
+
+def _format_time(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+def _get_version() -> str | None:
+    try:
+        return get_version()
+    except InvalidVersionFile as e:
+        print(e)
+        raise typer.Exit(code=1)
+
+
+@app.command(name="which")
+def cmd_which(
+    version: Optional[str] = typer.Argument(
+        None, help="Defaults to the version selected here.", show_default=False
+    ),
+    touch: bool = typer.Option(
+        False, "--touch", help="Record the version as used, for `tgenv gc`."
+    ),
+):
+    v = version or _get_version()
+    if v is None or not is_version_installed(v):
+        print(f"Missing Terragrunt version {v}")
+        raise typer.Exit(code=1)
+    if touch:
+        get_manifest().touch(v)
+    print(get_version_path(v))
+
+
+@app.command(name="init")
+def cmd_init(
+    shell_name: str = typer.Argument(
+        ..., metavar="SHELL", help="bash, zsh or fish.", show_default=False
+    ),
+):
+    if shell_name not in shell.SHELLS:
+        print(f"Unsupported shell {shell_name}")
+        raise typer.Exit(code=1)
+    print(shell.hook(shell_name), end="")
 
 
 @app.command(name="list-remote")
-def cmd_list_remote(limit: int = typer.Option(10), beta: bool = typer.Option(True)):
-    versions = get_remote_versions(limit)
+def cmd_list_remote(
+    limit: int = typer.Option(10),
+    beta: bool = typer.Option(True),
+    refresh: bool = typer.Option(False, help="Refresh the local tag index now."),
+):
+    versions = get_remote_versions(limit, refresh)
     for v in versions:
         _v = Version(v)
         if not _v.is_prerelease:
@@ -85,10 +255,72 @@ def cmd_list_remote(limit: int = typer.Option(10), beta: bool = typer.Option(Tru
     },
 )
 def cmd_exec():
-    v = get_version()
+    v = _get_version()
     if is_version_installed(v):
         path = get_version_path(v)
-        subprocess.run([path] + sys.argv[2:], check=True)
+        get_manifest().touch(v)
+        with tracing.span("exec", version=v):
+            subprocess.run([path] + sys.argv[2:], check=True)
     else:
         print(f"Missing Terragrunt version {v}")
         print(f"Please run `{app.info.name} install {v}`")
+
+
+@mirror_app.command(name="sync")
+def cmd_mirror_sync(
+    path: pathlib.Path = typer.Argument(
+        ..., help="Directory to fill with Terragrunt releases.", show_default=False
+    ),
+    versions: List[str] = typer.Argument(
+        ..., help="The versions of Terragrunt to mirror.", show_default=False
+    ),
+    os_names: List[str] = typer.Option([_OS], "--os"),
+    archs: List[str] = typer.Option([detect_arch()], "--arch"),
+):
+    platforms = [(os_name, arch) for os_name in os_names for arch in archs]
+    synced, missing, failed = mirror.sync(path, versions, platforms)
+    for v in synced:
+        print(f"Mirrored Terragrunt version {v}.")
+    for v in missing:
+        print(f"There is no version {v}")
+    for v, error in failed.items():
+        print(f"Mirroring Terragrunt version {v} failed: {error}")
+    if missing or failed:
+        raise typer.Exit(code=1)
+
+
+@bundle_app.command(name="export")
+def cmd_bundle_export(
+    path: pathlib.Path = typer.Argument(
+        ..., help="Archive to write.", show_default=False
+    ),
+    versions: List[str] = typer.Argument(
+        None, help="Versions to include; all installed by default.", show_default=False
+    ),
+    compress: str = typer.Option("", help="One of gz, bz2 or xz."),
+):
+    if compress not in bundle.COMPRESSIONS:
+        print(f"Unknown compression {compress}")
+        raise typer.Exit(code=1)
+    try:
+        exported = bundle.export_bundle(path, versions or [], compress)
+    except bundle.BundleError as e:
+        print(e)
+        raise typer.Exit(code=1)
+    print(f"Bundled {len(exported)} Terragrunt version(s) into {path}.")
+
+
+@bundle_app.command(name="import")
+def cmd_bundle_import(
+    path: pathlib.Path = typer.Argument(
+        ..., help="Archive written by `bundle export`.", show_default=False
+    ),
+):
+    try:
+        imported, skipped = bundle.import_bundle(path)
+    except (bundle.BundleError, tarfile.TarError) as e:
+        print(f"Import of {path} failed: {e}")
+        raise typer.Exit(code=1)
+    for v in imported:
+        print(f"Imported Terragrunt version {v}.")
+    print(f"{len(imported)} imported, {len(skipped)} already installed.")
@@ -0,0 +1,144 @@
+import bisect
+from typing import Iterable, List, Set
+
+from .version import InvalidVersion, Version
+
+_OPERATORS = ("~>", ">=", "<=", "!=", "==", ">", "<", "=")
+_WILDCARDS = ("x", "X", "*")
+
+
+class InvalidConstraint(ValueError):
+    pass
+
+
+class Constraint:
+    def __init__(self, spec: str) -> None:
+        self.spec = spec
+        self.lower: Version | None = None
+        self.lower_inclusive = True
+        self.upper: Version | None = None
+        self.upper_inclusive = True
+        self.excluded: Set[Version] = set()
+        self.prerelease = False
+        for clause in spec.split(","):
+            self._add(clause.strip())
+
+    def __repr__(self) -> str:
+        return f"<Constraint('{self.spec}')>"
+
+    def __contains__(self, v: Version) -> bool:
+        if self.lower is not None and (
+            v < self.lower or (v == self.lower and not self.lower_inclusive)
+        ):
+            return False
+        if self.upper is not None and (
+            v > self.upper or (v == self.upper and not self.upper_inclusive)
+        ):
+            return False
+        if v.is_prerelease and not self.prerelease:
+            return False
+        return v not in self.excluded
+
+    def resolve(self, versions: "Iterable[str] | SortedVersions") -> str | None:
+        if not isinstance(versions, SortedVersions):
+            versions = SortedVersions(versions)
+        return versions.highest(self)
+
+    def _add(self, clause: str) -> None:
+        if clause in ("latest", *_WILDCARDS):
+            return
+
+        for op in _OPERATORS:
+            if clause.startswith(op):
+                operand = clause[len(op) :].strip()
+                break
+        else:
+            op, operand = "=", clause
+
+        parts = operand.lstrip("vV").split(".")
+        if parts[-1] in _WILDCARDS:
+            if op not in ("=", "=="):
+                raise InvalidConstraint(f"Invalid constraint: '{self.spec}'")
+            self._wildcard(parts[:-1])
+            return
+
+        try:
+            v = Version(operand)
+        except InvalidVersion:
+            raise InvalidConstraint(f"Invalid constraint: '{self.spec}'")
+        if v.is_prerelease:
+            self.prerelease = True
+
+        match op:
+            case "~>":
+                if len(v.release) < 2:
+                    raise InvalidConstraint(f"Invalid constraint: '{self.spec}'")
+                bumped = v.release[:-2] + (v.release[-2] + 1,)
+                self._set_lower(v, True)
+                self._set_upper(Version(".".join(map(str, bumped))), False)
+            case ">=" | ">":
+                self._set_lower(v, op == ">=")
+            case "<=" | "<":
+                self._set_upper(v, op == "<=")
+            case "!=":
+                self.excluded.add(v)
+            case _:
+                self._set_lower(v, True)
+                self._set_upper(v, True)
+
+    def _wildcard(self, parts: List[str]) -> None:
+        if not parts:
+            return
+        try:
+            release = tuple(int(part) for part in parts)
+        except ValueError:
+            raise InvalidConstraint(f"Invalid constraint: '{self.spec}'")
+        bumped = release[:-1] + (release[-1] + 1,)
+        self._set_lower(Version(".".join(map(str, release))), True)
+        self._set_upper(Version(".".join(map(str, bumped))), False)
+
+    def _set_lower(self, v: Version, inclusive: bool) -> None:
+        if self.lower is None or v > self.lower or (v == self.lower and not inclusive):
+            self.lower, self.lower_inclusive = v, inclusive
+
+    def _set_upper(self, v: Version, inclusive: bool) -> None:
+        if self.upper is None or v < self.upper or (v == self.upper and not inclusive):
+            self.upper, self.upper_inclusive = v, inclusive
+
+
+class SortedVersions:
+    def __init__(self, versions: Iterable[str]) -> None:
+        keyed = {}
+        for name in versions:
+            try:
+                keyed[name] = Version(name)
+            except InvalidVersion:
+                continue
+        pairs = sorted(keyed.items(), key=lambda item: item[1]._key)
+        self.names = [name for name, _ in pairs]
+        self.versions = [v for _, v in pairs]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def highest(self, constraint: Constraint) -> str | None:
+        lo, hi = 0, len(self.versions)
+        if constraint.lower is not None:
+            find = (
+                bisect.bisect_left
+                if constraint.lower_inclusive
+                else bisect.bisect_right
+            )
+            lo = find(self.versions, constraint.lower)
+        if constraint.upper is not None:
+            find = (
+                bisect.bisect_right
+                if constraint.upper_inclusive
+                else bisect.bisect_left
+            )
+            hi = find(self.versions, constraint.upper)
+
+        for i in range(hi - 1, lo - 1, -1):
+            if self.versions[i] in constraint:
+                return self.names[i]
+        return None
@@ -0,0 +1,175 @@
+import os
+import pathlib
+import socketserver
+import threading
+import time
+
+from . import resolve
+from .daemon_client import is_owned
+from .manifest import LAST_USED_RESOLUTION, Manifest
+from .settings import TGENV_DAEMON_SOCKET, TGENV_VERSION_FILE_TTL
+
+
+class DaemonError(Exception):
+    pass
+
+
+class DaemonRunning(DaemonError):
+    pass
+
+
+class SocketNotOwned(DaemonError):
+    pass
+
+
+class _Result:
+    __slots__ = (
+        "answer",
+        "directory_mtime",
+        "file",
+        "file_mtime",
+        "versions_mtime",
+        "time",
+    )
+
+    def __init__(
+        self,
+        answer: tuple[str, pathlib.Path] | None,
+        directory_mtime: int,
+        file: pathlib.Path,
+        versions_mtime: int,
+    ) -> None:
+        self.answer = answer
+        self.directory_mtime = directory_mtime
+        self.file = file
+        self.file_mtime = _mtime(file)
+        self.versions_mtime = versions_mtime
+        self.time = time.monotonic()
+
+
+class Resolver:
+    # Answers are kept per directory and reused without taking the lock
+    # while the directory, the version file the answer came from and the
+    # versions directory (which every install and uninstall changes) are
+    # unchanged, and the answer is younger than TGENV_VERSION_FILE_TTL (the
+    # same rules as the on-disk memo). Misses resolve through the shim's
+    # code, one at a time. The parsed manifest is kept until the versions
+    # directory or the manifest file changes.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._manifest: Manifest | None = None
+        self._key: tuple[int, int] | None = None
+        self._results: dict[pathlib.Path, _Result] = {}
+        self._touched: dict[str, float] = {}
+
+    def lookup(self, directory: pathlib.Path) -> tuple[str, pathlib.Path] | None:
+        result = self._results.get(directory)
+        if result is not None and self._is_fresh(result, directory):
+            if result.answer is not None:
+                self._touch(result.answer[0])
+            return result.answer
+
+        with self._lock:
+            directory_mtime = _mtime(directory)
+            versions_mtime = _mtime(resolve.VERSIONS_DIR)
+            file = resolve.get_version_file(directory)
+            v = resolve.get_version(directory=directory)
+            manifest = self.manifest()
+            answer = None
+            if v is not None and v in manifest.load():
+                answer = v, resolve.get_version_path(v)
+            if file is not None:
+                # Without a version file the answer came from the network.
+                self._results[directory] = _Result(
+                    answer, directory_mtime, file, versions_mtime
+                )
+        if answer is not None:
+            self._touch(v)
+        return answer
+
+    def manifest(self) -> Manifest:
+        manifest = resolve.get_manifest()
+        key = (_mtime(manifest.versions_dir), _mtime(manifest.path))
+        if self._manifest is None or key != self._key:
+            self._manifest, self._key = manifest, key
+        return self._manifest
+
+    def _is_fresh(self, result: _Result, directory: pathlib.Path) -> bool:
+        return (
+            time.monotonic() - result.time < TGENV_VERSION_FILE_TTL
+            and _mtime(directory) == result.directory_mtime
+            and _mtime(result.file) == result.file_mtime
+            and _mtime(resolve.VERSIONS_DIR) == result.versions_mtime
+        )
+
+    def _touch(self, v: str) -> None:
+        # Manifest.touch rewrites at most once per LAST_USED_RESOLUTION, so
+        # only go to it (and the lock) that often.
+        if time.monotonic() - self._touched.get(v, -LAST_USED_RESOLUTION) < (
+            LAST_USED_RESOLUTION
+        ):
+            return
+        with self._lock:
+            self.manifest().touch(v)
+            self._touched[v] = time.monotonic()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "Daemon"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            directory = pathlib.Path(os.fsdecode(line.rstrip(b"\n")))
+            try:
+                answer = self.server.resolver.lookup(directory)
+            except Exception:
+                # Anything the daemon cannot answer, the shim resolves itself.
+                answer = None
+            v, path = answer if answer else ("", "")
+            self.wfile.write(os.fsencode(f"{v}\t{path}\n"))
+
+
+class Daemon(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str = TGENV_DAEMON_SOCKET) -> None:
+        self.path = path
+        self.resolver = Resolver()
+        if os.path.lexists(path):
+            if not is_owned(path):
+                raise SocketNotOwned(
+                    f"{path} exists and is not a socket owned by this user"
+                )
+            if _answers(path):
+                raise DaemonRunning(f"A daemon is already listening on {path}")
+            os.unlink(path)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _answers(path: str) -> bool:
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def _mtime(path: pathlib.Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
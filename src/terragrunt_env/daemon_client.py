@@ -0,0 +1,60 @@
+# The raw _socket module is used because `import socket` pulls in enum and
+# selectors, which costs the shim more than the lookup it saves.
+import _socket
+import os
+import stat
+import zlib
+
+from .location import tgenv_root
+
+CONNECT_TIMEOUT = 0.5
+
+
+def default_socket_path() -> str:
+    # One socket per user and tgenv root.
+    root = tgenv_root()
+    return "{}/tgenv-{}-{:08x}.sock".format(
+        os.environ.get("XDG_RUNTIME_DIR") or "/tmp",
+        os.getuid() if hasattr(os, "getuid") else 0,
+        zlib.crc32(os.fsencode(root)),
+    )
+
+
+def socket_path() -> str:
+    return os.environ.get("TGENV_DAEMON_SOCKET", default_socket_path())
+
+
+def is_owned(path: str) -> bool:
+    # The shim execs whatever binary the listener names, and the fallback
+    # socket lives in world-writable /tmp, so only trust a socket created by
+    # this user.
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def lookup(directory: str, path: str | None = None) -> tuple[str, str] | None:
+    path = socket_path() if path is None else path
+    if not path or not hasattr(_socket, "AF_UNIX") or not is_owned(path):
+        return None
+
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        sock.sendall(os.fsencode(directory) + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                return None
+            data += chunk
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+    version, _, binary = os.fsdecode(data[:-1]).partition("\t")
+    return (version, binary) if binary else None
@@ -0,0 +1,238 @@
+import hashlib
+import http.client
+import os
+import pathlib
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple, TypeVar
+
+from . import tracing
+from .session import SESSION, backoff, retry_delay
+from .settings import TGENV_DOWNLOAD_RETRIES, TGENV_DOWNLOAD_SEGMENTS
+
+BUFFER_SIZE = 1024 * 1024
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+T = TypeVar("T")
+
+
+class DownloadError(Exception):
+    pass
+
+
+class ChecksumMismatch(DownloadError):
+    pass
+
+
+def part_path(path: pathlib.Path) -> pathlib.Path:
+    return path.with_name(f"{path.name}.part")
+
+
+def fetch(
+    url: str,
+    path: pathlib.Path,
+    retries: int = TGENV_DOWNLOAD_RETRIES,
+    segments: int = TGENV_DOWNLOAD_SEGMENTS,
+    sha256: str | None = None,
+    mode: int | None = None,
+) -> str:
+    tmp_path = part_path(path)
+    with tracing.span("download", url=url, segments=segments) as span:
+        start = time.perf_counter()
+        if url.startswith("file:"):
+            digest = _copy(url, tmp_path)
+        else:
+            size = None
+            if segments > 1:
+                url, size = _probe(url)
+            if size is not None and size >= segments * MIN_SEGMENT_SIZE:
+                tmp_path = path.with_name(f"{path.name}.segments")
+                digest = _fetch_segmented(url, tmp_path, size, segments, retries)
+            else:
+                digest = _retry(url, retries, _fetch_into, url, tmp_path)
+        seconds = time.perf_counter() - start
+        size = tmp_path.stat().st_size
+        span.set(bytes=size, throughput=size / seconds if seconds else None)
+        tracing.incr("tgenv_download_bytes_total", size)
+        tracing.incr("tgenv_download_seconds_total", seconds)
+
+    if sha256 is not None and digest != sha256.lower():
+        tmp_path.unlink()
+        raise ChecksumMismatch(f"{url}: expected sha256 {sha256}, got {digest}")
+    # Set before the rename so the final path never holds a file without it.
+    if mode is not None:
+        tmp_path.chmod(mode)
+    os.replace(tmp_path, path)
+    return digest
+
+
+def _hash_file(path: pathlib.Path, size: int | None = None) -> "hashlib._Hash":
+    hasher = hashlib.sha256()
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    remaining = size
+    with open(path, "rb") as f:
+        while n := f.readinto(buffer):
+            if remaining is not None:
+                n = min(n, remaining)
+                remaining -= n
+            hasher.update(view[:n])
+            if remaining == 0:
+                break
+    return hasher
+
+
+def _copy(url: str, tmp_path: pathlib.Path) -> str:
+    source = urllib.request.url2pathname(urllib.parse.urlparse(url).path)
+    hasher = hashlib.sha256()
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    try:
+        src = open(source, "rb")
+    except FileNotFoundError:
+        raise urllib.error.HTTPError(url, 404, "Not Found", {}, None)
+    with src, open(tmp_path, "wb") as dst:
+        while n := src.readinto(buffer):
+            dst.write(view[:n])
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def _retry(url: str, retries: int, func: Callable[..., T], *args: Any) -> T:
+    for attempt in range(retries + 1):
+        try:
+            return func(*args)
+        except urllib.error.HTTPError as e:
+            # The same rules as the session's own retries, Retry-After
+            # included.
+            delay = retry_delay(attempt, e.code, e.headers)
+            if delay is None:
+                raise
+            error = e
+        except (OSError, http.client.HTTPException, DownloadError) as e:
+            delay = backoff(attempt)
+            error = e
+        if attempt < retries:
+            tracing.incr("tgenv_http_retries_total")
+            time.sleep(delay)
+    raise DownloadError(f"{url}: {error}")
+
+
+def _probe(url: str) -> Tuple[str, int | None]:
+    try:
+        with SESSION.request("HEAD", url) as r:
+            length = r.headers.get("Content-Length")
+            if r.headers.get("Accept-Ranges") != "bytes" or length is None:
+                return r.url, None
+            return r.url, int(length)
+    except (OSError, http.client.HTTPException):
+        return url, None
+
+
+def split_ranges(size: int, segments: int) -> List[Tuple[int, int]]:
+    step = -(-size // segments)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+
+def _fetch_segmented(
+    url: str, tmp_path: pathlib.Path, size: int, segments: int, retries: int
+) -> str:
+    with open(tmp_path, "wb") as f:
+        f.truncate(size)
+
+    try:
+        with ThreadPoolExecutor(max_workers=segments) as pool:
+            futures = [
+                pool.submit(_fetch_segment, url, tmp_path, start, end, retries)
+                for start, end in split_ranges(size, segments)
+            ]
+            for future in futures:
+                future.result()
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    # Segments arrive out of order, so the digest needs one pass over the
+    # assembled file instead of being computed while streaming.
+    return _hash_file(tmp_path).hexdigest()
+
+
+def _fetch_segment(
+    url: str, tmp_path: pathlib.Path, start: int, end: int, retries: int
+) -> None:
+    done = [start]
+    _retry(url, retries, _fetch_range_into, url, tmp_path, done, end)
+
+
+def _fetch_range_into(
+    url: str, tmp_path: pathlib.Path, done: List[int], end: int
+) -> None:
+    headers = {"Range": f"bytes={done[0]}-{end}"}
+    with SESSION.request("GET", url, headers=headers) as response:
+        if getattr(response, "status", None) != 206:
+            raise DownloadError("server ignored the Range header")
+        start, _ = _parse_content_range(response.headers["Content-Range"])
+        if start != done[0]:
+            raise DownloadError(f"server sent byte {start}, not {done[0]}")
+
+        buffer = bytearray(min(BUFFER_SIZE, end - start + 1))
+        view = memoryview(buffer)
+        with open(tmp_path, "r+b") as f:
+            f.seek(start)
+            while done[0] <= end and (n := response.readinto(buffer)):
+                f.write(view[:n])
+                done[0] += n
+
+    if done[0] != end + 1:
+        raise DownloadError(f"segment ended at byte {done[0]}, expected {end + 1}")
+
+
+def _fetch_into(url: str, tmp_path: pathlib.Path) -> str:
+    offset = tmp_path.stat().st_size if tmp_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    try:
+        response = SESSION.request("GET", url, headers=headers)
+    except urllib.error.HTTPError as e:
+        if e.code == 416:
+            tmp_path.unlink()
+            raise DownloadError("stale partial download discarded")
+        raise
+
+    with response:
+        if getattr(response, "status", None) == 206:
+            start, total = _parse_content_range(response.headers["Content-Range"])
+            if start != offset:
+                tmp_path.unlink()
+                raise DownloadError(f"server resumed at byte {start}, not {offset}")
+            hasher = _hash_file(tmp_path, offset)
+            mode = "ab"
+        else:
+            offset = 0
+            length = response.headers.get("Content-Length")
+            total = int(length) if length is not None else None
+            hasher = hashlib.sha256()
+            mode = "wb"
+
+        written = offset
+        buffer = bytearray(BUFFER_SIZE)
+        view = memoryview(buffer)
+        with open(tmp_path, mode) as f:
+            while n := response.readinto(buffer):
+                f.write(view[:n])
+                hasher.update(view[:n])
+                written += n
+
+    if total is not None and written != total:
+        raise DownloadError(f"received {written} of {total} bytes")
+    return hasher.hexdigest()
+
+
+def _parse_content_range(value: str) -> tuple[int, int | None]:
+    # bytes <start>-<end>/<total or *>
+    span, _, total = value.split(" ", 1)[1].partition("/")
+    start = int(span.split("-", 1)[0])
+    return start, int(total) if total != "*" else None
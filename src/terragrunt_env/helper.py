@@ -1,24 +1,55 @@
-import json
 import os
 import pathlib
 import platform
 import urllib.error
-import urllib.request
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Set, Tuple
 
 import typer
 
-TGENV_ROOT = pathlib.Path(__file__).parent
-VERSIONS_DIR = pathlib.Path(TGENV_ROOT) / "versions"
-VERSIONS_DIR.mkdir(exist_ok=True)
-
-TGENV_ARCH = os.environ.get("TGENV_ARCH", "amd64")
-_OS = platform.system().lower()
-_SUFFIX = "" if _OS != "windows" else ".exe"
-_BIN_FILE_NAME = f"terragrunt{_SUFFIX}"
+from . import remote, store, tracing
+from .constraints import Constraint, InvalidConstraint
+from .download import ChecksumMismatch, DownloadError, fetch
+from .lock import FileLock, LockTimeout
+from .manifest import Entry
+from .remote import (asset_name, check_remote_version, get_remote_versions,
+                     is_offline, set_offline)
+from .resolve import (VERSION_FILE_NAME, clear_version_file_memo,
+                      find_version_file, get_lock_path, get_manifest,
+                      get_version, get_version_file, get_version_from_file,
+                      get_version_path, installed_versions, is_constraint,
+                      is_version_installed, parse_version)
+from .settings import (_BIN_FILE_NAME, _OS, _SUFFIX, CACHE_DIR, TGENV_ARCH,
+                       TGENV_CACHE_TTL, TGENV_DAEMON_SOCKET,
+                       TGENV_GC_MAX_BYTES, TGENV_GC_MAX_COUNT, TGENV_ROOT,
+                       TGENV_SHARED, VERSIONS_DIR)
+
+
+def prepare_store() -> None:
+    VERSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    if not TGENV_SHARED:
+        return
+    # Members of the store's group share it: whatever tgenv creates is group
+    # writable, and directories pass the group on through the setgid bit.
+    os.umask(os.umask(0) & ~0o020)
+    for path in (TGENV_ROOT, VERSIONS_DIR):
+        mode = path.stat().st_mode
+        if mode & 0o2070 != 0o2070:
+            try:
+                path.chmod(mode | 0o2070)
+            except PermissionError:
+                pass
+
+
+prepare_store()
+
+PREFETCH_JOBS = 4
+PREFETCH_SKIP_DIRS = frozenset((".git", ".terragrunt-cache", "node_modules"))
 
 
 def detect_arch() -> str:
+    if TGENV_ARCH:
+        return TGENV_ARCH
     match platform.machine().lower():
         case "amd64" | "x86_64":
             return "amd64"
@@ -30,26 +61,84 @@ def detect_arch() -> str:
             return "amd64"
 
 
-def parse_version(v: str) -> str:
-    return v
-
-
 def remove_version(version: str) -> None:
-    version_dir = VERSIONS_DIR / version
-    if version_dir.exists():
-        (version_dir / "terragrunt").unlink(missing_ok=True)
-        (version_dir / "terragrunt.exe").unlink(missing_ok=True)
-        version_dir.rmdir()
+    if uninstall_version(version):
         print(f"Terragrunt {version=} uninstalled.")
     else:
         print(f"There is no Terragrunt {version=}.")
 
 
-def get_version(version: str = "latest") -> str | None:
-    v = get_version_from_file()
-    if v is None:
-        v = check_remote_version(version)
-    return parse_version(v)
+def uninstall_version(version: str) -> bool:
+    version_dir = get_version_path(version).parent
+    if not version_dir.exists():
+        return False
+    digest = get_digest(version)
+    for item in version_dir.iterdir():
+        item.unlink(missing_ok=True)
+    version_dir.rmdir()
+    if digest:
+        store.release(digest)
+    get_manifest().remove(version)
+    return True
+
+
+def pinned_versions() -> Set[str]:
+    paths = [
+        find_version_file(pathlib.Path.cwd()),
+        pathlib.Path.home() / VERSION_FILE_NAME,
+        TGENV_ROOT / "version",
+    ]
+    pins = set()
+    for path in filter(None, paths):
+        try:
+            with open(path, "r") as f:
+                pin = f.read().strip()
+        except OSError:
+            continue
+        if is_constraint(pin):
+            try:
+                pin = Constraint(pin).resolve(installed_versions()) or pin
+            except InvalidConstraint:
+                continue
+        pins.add(pin)
+    return pins
+
+
+def collect_garbage(
+    max_bytes: int = 0,
+    max_count: int = 0,
+    dry_run: bool = False,
+    keep: Iterable[str] = (),
+) -> List[Entry]:
+    # Least recently used first; versions pinned here, in the home directory
+    # or as the default are never candidates, even if that leaves the store
+    # over budget.
+    entries = get_manifest().load()
+    protected = pinned_versions().union(keep)
+    candidates = sorted(
+        (e for e in entries.values() if e.version not in protected),
+        key=lambda e: e.last_used or e.installed_at,
+    )
+    size = sum(e.size for e in entries.values())
+    count = len(entries)
+
+    evicted = []
+    for entry in candidates:
+        over_bytes = max_bytes and size > max_bytes
+        over_count = max_count and count > max_count
+        if not over_bytes and not over_count:
+            break
+        if dry_run or uninstall_version(entry.version):
+            evicted.append(entry)
+        size -= entry.size
+        count -= 1
+    return evicted
+
+
+def auto_collect_garbage(keep: Iterable[str] = ()) -> List[Entry]:
+    if not TGENV_GC_MAX_BYTES and not TGENV_GC_MAX_COUNT:
+        return []
+    return collect_garbage(TGENV_GC_MAX_BYTES, TGENV_GC_MAX_COUNT, keep=keep)
 
 
 def use_version(
@@ -58,11 +147,12 @@ def use_version(
     if installation:
         path = TGENV_ROOT / "version"
     elif local:
-        path = pathlib.Path.cwd() / ".terragrunt-version"
+        path = pathlib.Path.cwd() / VERSION_FILE_NAME
     else:
-        path = pathlib.Path.home() / ".terragrunt-version"
+        path = pathlib.Path.home() / VERSION_FILE_NAME
 
     save_version(path, version)
+    clear_version_file_memo()
 
 
 def save_version(path: pathlib.Path, version: str) -> None:
@@ -71,74 +161,156 @@ def save_version(path: pathlib.Path, version: str) -> None:
         f.write("\n")
 
 
-def get_version_from_file() -> str | None:
-    path = get_version_file()
-    if path:
-        with open(path, "r") as f:
-            return f.read().strip()
-    return None
-
-
-def get_version_file() -> pathlib.Path | None:
-    local_version = pathlib.Path.cwd() / ".terragrunt-version"
-    if local_version.exists():
-        return local_version
-
-    global_version = pathlib.Path.home() / ".terragrunt-version"
-    if global_version.exists():
-        return global_version
+def resolve_remote_version(version: str) -> str | None:
+    if not is_constraint(version):
+        return check_remote_version(version)
+    candidates = [*get_remote_versions(limit=0), *installed_versions()]
+    return Constraint(version).resolve(candidates)
 
-    recent_version = TGENV_ROOT / "version"
-    if recent_version.exists():
-        return recent_version
 
-    return None
-
-
-def is_version_installed(version: str) -> bool:
-    return get_version_path(version).exists()
+def install_version(version: str) -> pathlib.Path:
+    # Concurrent installs of one version (parallel CI jobs on a host) queue
+    # on its lock; whoever comes second finds it installed and reuses it.
+    try:
+        with FileLock(get_lock_path(version)):
+            if is_version_installed(version):
+                return get_version_path(version)
+            get_version_path(version).parent.mkdir(parents=True, exist_ok=True)
+            path = download_version(version)
+            set_execution_permission(path)
+            digest = get_digest(version)
+            if not digest:
+                path.unlink()
+                print(f"Installation of Terragrunt {version=} failed: no sha256.")
+                raise typer.Exit(code=1)
+            get_manifest().add(version, digest)
+    except LockTimeout as e:
+        print(f"Installation of Terragrunt {version=} failed: {e}")
+        raise typer.Exit(code=1)
+    return path
 
 
-def get_version_path(version: str) -> pathlib.Path:
-    return VERSIONS_DIR / version / _BIN_FILE_NAME
+def find_version_files(root: pathlib.Path) -> Iterator[pathlib.Path]:
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in PREFETCH_SKIP_DIRS]
+        if VERSION_FILE_NAME in files:
+            yield pathlib.Path(directory, VERSION_FILE_NAME)
 
 
-def check_remote_version(version: str) -> str | None:
-    if version != "latest":
-        version = f"v{version}"
-    url = f"https://github.com/gruntwork-io/terragrunt/releases/{version}"
+def find_pinned_versions(root: pathlib.Path) -> Set[str]:
+    pins = set()
+    for path in find_version_files(root):
+        with open(path, "r") as f:
+            pin = f.read().strip()
+        if pin:
+            pins.add(pin)
+    return pins
+
+
+def prefetch(
+    pins: Set[str], jobs: int = PREFETCH_JOBS
+) -> Tuple[List[str], List[str], List[str]]:
+    # Pins are resolved first so two pins naming the same release (e.g.
+    # "0.55.x" and "0.55.3") never download it twice at the same time.
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        resolved = dict(zip(pins, pool.map(_resolve_pin, pins)))
+        failed = sorted(pin for pin, v in resolved.items() if v is None)
+        versions = {v for v in resolved.values() if v is not None}
+        present = sorted(v for v in versions if is_version_installed(v))
+        missing = sorted(versions.difference(present))
+        results = pool.map(_prefetch_one, missing)
+        installed = [v for v, ok in zip(missing, results) if ok]
+    failed.extend(v for v in missing if v not in installed)
+    return installed, present, failed
+
+
+def _resolve_pin(pin: str) -> str | None:
     try:
-        response = urllib.request.urlopen(url)
-    except urllib.error.HTTPError:
+        v = resolve_remote_version(pin)
+    except urllib.error.URLError as e:
+        print(f"Looking up Terragrunt version {pin} failed: {e.reason}")
         return None
-    return response.url.split("/")[-1][1:] if response.code == 200 else None
-
+    except InvalidConstraint as e:
+        print(e)
+        return None
+    if v is None:
+        print(f"There is no version {pin}")
+    return v
 
-def get_remote_versions(limit: int = 10) -> List[str]:
-    url = f"https://api.github.com/repos/gruntwork-io/terragrunt/tags?per_page={limit}"
-    response = urllib.request.urlopen(url)
 
-    data = json.loads(response.read())
-    return [ver["name"].lstrip("v") for ver in data]
+def _prefetch_one(version: str) -> bool:
+    try:
+        install_version(version)
+    except typer.Exit:
+        return False
+    print(f"Installation of Terragrunt version {version} successful.")
+    return True
 
 
 def download_version(version: str) -> pathlib.Path:
-    _arch = detect_arch()
-    url = f"https://github.com/gruntwork-io/terragrunt/releases/download/v{version}/terragrunt_{_OS}_{_arch}{_SUFFIX}"
-    download_path = VERSIONS_DIR / version / _BIN_FILE_NAME
+    name = asset_name(_OS, detect_arch())
+    download_path = get_version_path(version)
+    if is_offline():
+        print(f"Terragrunt {version=} is not installed and tgenv is offline.")
+        raise typer.Exit(code=1)
     try:
-        urllib.request.urlretrieve(url, download_path)
+        sha256 = remote.SOURCE.checksums(version).get(name)
+        if sha256 and store.restore(sha256, download_path):
+            digest = sha256
+        else:
+            url = remote.SOURCE.asset_url(version, name)
+            digest = fetch(url, download_path, sha256=sha256, mode=execution_mode())
     except urllib.error.HTTPError as e:
         if e.code == 404:
             print(f"There is no Terragrunt {version=}.")
-            raise typer.Exit(code=1)
+        else:
+            print(f"Download of Terragrunt {version=} failed: {e}")
+        raise typer.Exit(code=1)
+    except urllib.error.URLError as e:
+        print(f"Download of Terragrunt {version=} failed: {e.reason}")
+        raise typer.Exit(code=1)
+    except ChecksumMismatch as e:
+        print(f"Checksum verification of Terragrunt {version=} failed: {e}")
+        raise typer.Exit(code=1)
+    except DownloadError as e:
+        print(f"Download of Terragrunt {version=} failed: {e}")
+        raise typer.Exit(code=1)
 
+    save_digest(download_path, digest)
+    store.publish(download_path, digest)
     return download_path
 
 
+def get_digest_path(path: pathlib.Path) -> pathlib.Path:
+    return path.with_name(f"{path.name}.sha256")
+
+
+def save_digest(path: pathlib.Path, digest: str) -> None:
+    with open(get_digest_path(path), "w") as f:
+        f.write(f"{digest}  {path.name}\n")
+
+
+def get_digest(version: str) -> str | None:
+    try:
+        with open(get_digest_path(get_version_path(version)), "r") as f:
+            return f.read().split()[0]
+    except (FileNotFoundError, IndexError):
+        return None
+
+
+def execution_mode() -> int:
+    return 0o775 if TGENV_SHARED else 0o755
+
+
 def set_execution_permission(path: pathlib.Path) -> None:
+    # A binary restored from the object store may be a link to a file owned
+    # by another user of a shared store, which only they can chmod.
+    mode = execution_mode()
+    if path.stat().st_mode & 0o777 == mode:
+        return
     try:
-        path.chmod(0o755)
+        with tracing.span("chmod", path=path):
+            path.chmod(mode)
     except PermissionError:
         print("Change rights failed.")
         raise typer.Exit(code=1)
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+from . import daemon_client
+
+_START = time.perf_counter()
+
+
+def main() -> None:
+    # A running `tgenv daemon` answers with the binary to run, so the shim
+    # does not import pathlib or the resolution modules at all.
+    answer = daemon_client.lookup(os.getcwd())
+    if answer is not None:
+        try:
+            return _exec(*answer)
+        except OSError:
+            pass
+
+    from .resolve import (InvalidVersionFile, get_manifest, get_version,
+                          get_version_path)
+
+    try:
+        v = get_version()
+    except InvalidVersionFile as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    manifest = get_manifest()
+    if v is None or v not in manifest.load():
+        _missing(v)
+    manifest.touch(v)
+    try:
+        _exec(v, str(get_version_path(v)))
+    except FileNotFoundError:
+        # The binary was deleted by hand; drop it from the manifest too.
+        manifest.rebuild()
+        _missing(v)
+    except OSError as e:
+        # Not executable, or built for another platform (ENOEXEC).
+        print(f"Cannot run Terragrunt version {v}: {e.strerror}", file=sys.stderr)
+        print(
+            f"Please reinstall it with `tgenv uninstall {v} && tgenv install {v}`",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def _exec(v: str, path: str) -> None:
+    argv = [path] + sys.argv[1:]
+    if "TGENV_TRACE" in os.environ or "TGENV_METRICS_FILE" in os.environ:
+        _report(v)
+    if os.name == "nt":
+        import subprocess
+
+        sys.exit(subprocess.call(argv))
+    os.execv(path, argv)
+
+
+def _report(v: str) -> None:
+    from . import tracing
+
+    # Nothing runs after execv, so report the shim overhead and flush metrics
+    # by hand; atexit handlers would be discarded with the process image.
+    overhead = time.perf_counter() - _START
+    tracing.emit("shim", time.time() - overhead, overhead, version=v)
+    tracing.incr("tgenv_shim_execs_total")
+    tracing.incr("tgenv_shim_seconds_total", overhead)
+    tracing.flush_metrics()
+
+
+def _missing(v: str | None) -> None:
+    print(f"Missing Terragrunt version {v}", file=sys.stderr)
+    print(f"Please run `tgenv install {v}`", file=sys.stderr)
+    sys.exit(1)
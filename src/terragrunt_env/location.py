@@ -0,0 +1,13 @@
+import os
+
+
+def tgenv_root() -> str:
+    # os.path only: the shim needs this to find the daemon's socket before it
+    # decides whether to import anything heavier.
+    root = os.environ.get("TGENV_ROOT")
+    if root:
+        return os.path.abspath(os.path.expanduser(root))
+    data = os.environ.get("XDG_DATA_HOME") or os.path.join(
+        os.path.expanduser("~"), ".local", "share"
+    )
+    return os.path.join(data, "tgenv")
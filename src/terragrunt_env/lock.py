@@ -0,0 +1,122 @@
+import os
+import pathlib
+import socket
+import time
+
+from .settings import TGENV_LOCK_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+POLL_INTERVAL = 0.01
+MAX_POLL_INTERVAL = 0.2
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+class FileLock:
+    # On POSIX an flock on the lock file, which the kernel releases when its
+    # holder dies, so there is nothing stale to break. Elsewhere the file is
+    # created with O_EXCL and held open, which keeps Windows from renaming
+    # or deleting it under a live holder; a waiter breaks it once it is older
+    # than `stale_after`. Either way the file holds "pid host" for humans.
+    def __init__(
+        self,
+        path: pathlib.Path,
+        timeout: float = TGENV_LOCK_TIMEOUT,
+        stale_after: float | None = None,
+    ) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = timeout if stale_after is None else stale_after
+        self._fd: int | None = None
+
+    def acquire(self) -> None:
+        deadline = time.monotonic() + self.timeout
+        interval = POLL_INTERVAL
+        while not self._create():
+            if fcntl is None and self._is_stale():
+                self._break()
+                continue
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"Timed out waiting for {self.path}")
+            time.sleep(interval)
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+    def release(self) -> None:
+        # Unlinked while still held under flock, so a waiter that locks the
+        # old inode afterwards sees it is no longer the path and starts over.
+        # Windows cannot delete a file that is still open, so there the file
+        # is closed first; if a waiter has since broken it and taken a new
+        # lock, that one is open and the unlink fails.
+        if fcntl is not None:
+            self.path.unlink(missing_ok=True)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if fcntl is None:
+            try:
+                self.path.unlink(missing_ok=True)
+            except PermissionError:
+                pass
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    def _create(self) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            if fcntl is None:
+                try:
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+                except FileExistsError:
+                    return False
+                break
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            if _same_file(fd, self.path):
+                break
+            os.close(fd)
+
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()} {socket.gethostname()}\n".encode())
+        self._fd = fd
+        return True
+
+    def _is_stale(self) -> bool:
+        try:
+            return time.time() - self.path.stat().st_mtime >= self.stale_after
+        except OSError:
+            return False
+
+    def _break(self) -> None:
+        # The rename fails while a live holder keeps the file open, and once
+        # it succeeds the file is ours alone to delete, so a lock another
+        # waiter has just broken and retaken is never removed.
+        aside = self.path.with_name(f"{self.path.name}.{os.getpid()}.stale")
+        try:
+            os.rename(self.path, aside)
+        except OSError:
+            return
+        aside.unlink(missing_ok=True)
+
+
+def _same_file(fd: int, path: pathlib.Path) -> bool:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return False
+    fst = os.fstat(fd)
+    return (st.st_dev, st.st_ino) == (fst.st_dev, fst.st_ino)
@@ -0,0 +1,166 @@
+import _thread
+import os
+import pathlib
+import time
+
+from .settings import _BIN_FILE_NAME
+
+MANIFEST_SUFFIX = ".manifest"
+LAST_USED_RESOLUTION = 3600
+
+
+class Entry:
+    __slots__ = ("version", "size", "sha256", "installed_at", "last_used")
+
+    def __init__(
+        self,
+        version: str,
+        size: int = 0,
+        sha256: str = "",
+        installed_at: float = 0.0,
+        last_used: float = 0.0,
+    ) -> None:
+        self.version = version
+        self.size = size
+        self.sha256 = sha256
+        self.installed_at = installed_at
+        self.last_used = last_used
+
+    def __repr__(self) -> str:
+        return f"<Entry('{self.version}', size={self.size})>"
+
+    @classmethod
+    def parse(cls, line: str) -> "Entry":
+        version, size, sha256, installed_at, last_used = line.split("\t")
+        return cls(version, int(size), sha256, float(installed_at), float(last_used))
+
+    def format(self) -> str:
+        fields = (self.version, self.size, self.sha256, self.installed_at)
+        return "\t".join(map(str, (*fields, self.last_used)))
+
+
+class Manifest:
+    # The manifest sits next to the versions directory, one tab-separated line
+    # per installed version under a header holding the directory's mtime. A
+    # changed mtime means versions were added or removed behind tgenv's back,
+    # so the manifest is rebuilt from a scan; otherwise a lookup is one stat
+    # and one small read, and the shim never needs to import json.
+    def __init__(self, versions_dir: pathlib.Path) -> None:
+        self.versions_dir = versions_dir
+        self.path = versions_dir.with_name(versions_dir.name + MANIFEST_SUFFIX)
+        self._entries: dict[str, Entry] | None = None
+        self._mtime = 0
+
+    def load(self) -> dict[str, Entry]:
+        if self._entries is not None:
+            return self._entries
+        try:
+            self._mtime = self.versions_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._entries = {}
+            return self._entries
+
+        mtime, entries = self._read()
+        if mtime == self._mtime:
+            self._entries = entries
+            return entries
+        return self.rebuild(entries)
+
+    def rebuild(self, previous: dict[str, Entry] | None = None) -> dict[str, Entry]:
+        previous = previous or {}
+        self._entries = {}
+        try:
+            self._mtime = self.versions_dir.stat().st_mtime_ns
+            items = list(self.versions_dir.iterdir())
+        except FileNotFoundError:
+            return self._entries
+
+        for item in items:
+            path = item / _BIN_FILE_NAME
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            # A binary that never got its mode is a partial install.
+            if not os.access(path, os.X_OK):
+                continue
+            entry = previous.get(item.name)
+            if entry is None or entry.size != stat.st_size:
+                entry = Entry(
+                    item.name, stat.st_size, _read_digest(path), stat.st_mtime
+                )
+            self._entries[item.name] = entry
+        self._save()
+        return self._entries
+
+    def add(self, version: str, sha256: str = "") -> Entry:
+        with self._lock():
+            entries = self.load()
+            path = self.versions_dir / version / _BIN_FILE_NAME
+            now = time.time()
+            entry = Entry(version, path.stat().st_size, sha256, now, now)
+            entries[version] = entry
+            self._refresh_mtime()
+            self._save()
+        return entry
+
+    def remove(self, version: str) -> None:
+        with self._lock():
+            entries = self.load()
+            if entries.pop(version, None) is not None:
+                self._refresh_mtime()
+                self._save()
+
+    def touch(self, version: str) -> None:
+        # last_used only needs to be good enough for eviction, so the shim
+        # rewrites the manifest at most once per LAST_USED_RESOLUTION.
+        entry = self.load().get(version)
+        now = time.time()
+        if entry is not None and now - entry.last_used >= LAST_USED_RESOLUTION:
+            entry.last_used = now
+            self._save()
+
+    def _lock(self) -> "FileLock":
+        # Adds and removes are read-modify-write, so concurrent installs of
+        # different versions would drop each other's entries. Holding the
+        # lock, the manifest is re-read from disk. lock imports socket, which
+        # the shim does not need for touch().
+        from .lock import FileLock
+
+        self._entries = None
+        return FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    def _refresh_mtime(self) -> None:
+        try:
+            self._mtime = self.versions_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._mtime = 0
+
+    def _read(self) -> tuple[int, dict[str, Entry]]:
+        try:
+            with open(self.path, "r") as f:
+                mtime = int(f.readline())
+                entries = (Entry.parse(line.rstrip("\n")) for line in f)
+                return mtime, {entry.version: entry for entry in entries}
+        except (OSError, ValueError):
+            return -1, {}
+
+    def _save(self) -> None:
+        lines = [str(self._mtime)]
+        lines.extend(self._entries[v].format() for v in sorted(self._entries))
+        suffix = f"{os.getpid()}.{_thread.get_ident()}.tmp"
+        tmp_path = self.path.with_name(f"{self.path.name}.{suffix}")
+        try:
+            with open(tmp_path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+def _read_digest(path: pathlib.Path) -> str:
+    try:
+        with open(path.with_name(f"{path.name}.sha256"), "r") as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return ""
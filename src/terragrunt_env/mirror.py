@@ -0,0 +1,86 @@
+import json
+import os
+import pathlib
+import urllib.error
+from typing import Dict, Iterable, List, Tuple
+
+from .download import DownloadError, fetch
+from .remote import CHECKSUMS_FILE_NAME, GitHubSource, asset_name
+from .version import Version
+
+
+def asset_path(root: pathlib.Path, version: str, name: str) -> pathlib.Path:
+    return root / "releases" / "download" / f"v{version}" / name
+
+
+def sync(
+    root: pathlib.Path,
+    versions: Iterable[str],
+    platforms: Iterable[Tuple[str, str]],
+    source: GitHubSource | None = None,
+) -> Tuple[List[str], List[str], Dict[str, str]]:
+    # A version that fails is reported and skipped; the index still lists
+    # every version that made it.
+    source = source or GitHubSource()
+    synced, missing, failed = [], [], {}
+    for version in versions:
+        try:
+            v = source.resolve(version)
+            if v is None:
+                missing.append(version)
+                continue
+            _sync_version(root, v, platforms, source)
+        except urllib.error.HTTPError as e:
+            failed[version] = f"{e.filename}: {e}"
+            continue
+        except urllib.error.URLError as e:
+            failed[version] = str(e.reason)
+            continue
+        except DownloadError as e:
+            failed[version] = str(e)
+            continue
+        synced.append(v)
+
+    update_index(root, synced)
+    return synced, missing, failed
+
+
+def _sync_version(
+    root: pathlib.Path,
+    version: str,
+    platforms: Iterable[Tuple[str, str]],
+    source: GitHubSource,
+) -> None:
+    checksums = source.checksums(version)
+    for os_name, arch in platforms:
+        name = asset_name(os_name, arch)
+        path = asset_path(root, version, name)
+        if path.exists():
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fetch(source.asset_url(version, name), path, sha256=checksums.get(name))
+    if checksums:
+        save_checksums(asset_path(root, version, CHECKSUMS_FILE_NAME), checksums)
+
+
+def save_checksums(path: pathlib.Path, checksums: Dict[str, str]) -> None:
+    with open(path, "w") as f:
+        for name, digest in sorted(checksums.items()):
+            f.write(f"{digest}  {name}\n")
+
+
+def update_index(root: pathlib.Path, versions: Iterable[str]) -> List[str]:
+    index_path = root / "index.json"
+    try:
+        with open(index_path, "r") as f:
+            known = json.load(f)["versions"]
+    except FileNotFoundError:
+        known = []
+
+    merged = sorted(set(known) | set(versions), key=Version, reverse=True)
+    root.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f"index.json.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"versions": merged}, f, indent=2)
+    os.replace(tmp_path, index_path)
+    return merged
@@ -0,0 +1,318 @@
+import itertools
+import json
+import pathlib
+import re
+import time
+import urllib.error
+import urllib.parse
+from typing import Any, Dict, Iterable, List
+
+from .cache import MISSING, Cache
+from .resolve import installed_versions
+from .session import REDIRECT_CODES, SESSION, parse_retry_after
+from .settings import (CACHE_DIR, GITHUB_TOKEN, TGENV_CACHE_TTL,
+                       TGENV_HTTP_RETRIES, TGENV_MIRROR, TGENV_OFFLINE,
+                       TGENV_RATE_LIMIT_RESERVE)
+from .version import InvalidVersion, Version, sort_versions
+
+GITHUB_URL = "https://github.com/gruntwork-io/terragrunt"
+GITHUB_API_URL = "https://api.github.com/repos/gruntwork-io/terragrunt"
+
+CHECKSUMS_FILE_NAME = "SHA256SUMS"
+TAGS_PER_PAGE = 100
+
+RESOLUTION_CACHE = Cache(CACHE_DIR / "resolve.json", ttl=TGENV_CACHE_TTL)
+TAG_INDEX = Cache(CACHE_DIR / "tags.json", ttl=TGENV_CACHE_TTL)
+RATE_LIMIT_CACHE = Cache(CACHE_DIR / "ratelimit.json", ttl=0)
+
+_NEXT_LINK = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+OFFLINE = TGENV_OFFLINE
+
+
+def asset_name(os_name: str, arch: str) -> str:
+    suffix = ".exe" if os_name == "windows" else ""
+    return f"terragrunt_{os_name}_{arch}{suffix}"
+
+
+def parse_checksums(text: str) -> Dict[str, str]:
+    checksums = {}
+    for line in text.splitlines():
+        digest, _, name = line.strip().partition(" ")
+        if name:
+            checksums[name.strip().lstrip("*")] = digest.lower()
+    return checksums
+
+
+class RateLimited(urllib.error.URLError):
+    pass
+
+
+class RateLimits:
+    # The request budget each host last reported, kept in the cache directory
+    # so that every tgenv process on a machine knows it before asking.
+    def __init__(self, cache: Cache) -> None:
+        self.cache = cache
+
+    def remaining(self, host: str) -> int | None:
+        entry = self.cache.get(host, stale=True)
+        if entry is MISSING or entry["reset"] <= time.time():
+            return None
+        return entry["remaining"]
+
+    def update(self, host: str, headers: Any) -> None:
+        if headers is None:
+            return
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        remaining = headers.get("X-RateLimit-Remaining")
+        if retry_after is not None:
+            entry = {"remaining": 0, "reset": time.time() + retry_after}
+        elif remaining is not None:
+            reset = float(headers.get("X-RateLimit-Reset", 0))
+            entry = {"remaining": int(remaining), "reset": reset}
+        else:
+            return
+        self.cache.set(host, entry)
+
+
+RATE_LIMITS = RateLimits(RATE_LIMIT_CACHE)
+
+
+class GitHubSource:
+    def __init__(
+        self,
+        url: str = GITHUB_URL,
+        api_url: str = GITHUB_API_URL,
+        token: str | None = None,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.api_url = api_url.rstrip("/")
+        # GITHUB_TOKEN only ever goes to the GitHub API.
+        if token is None:
+            token = GITHUB_TOKEN if self.api_url == GITHUB_API_URL else ""
+        self.token = token
+
+    def asset_url(self, version: str, name: str) -> str:
+        return f"{self.url}/releases/download/v{version}/{name}"
+
+    def checksums(self, version: str) -> Dict[str, str]:
+        url = self.asset_url(version, CHECKSUMS_FILE_NAME)
+        try:
+            response = self._request("GET", url)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return {}
+            raise
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, FileNotFoundError):
+                return {}
+            raise
+        return parse_checksums(response.read().decode())
+
+    def resolve(self, version: str) -> str | None:
+        cached = RESOLUTION_CACHE.get(version)
+        if cached is not MISSING:
+            return cached
+
+        # A HEAD request is enough: "latest" answers with a redirect to the
+        # tag page and an explicit tag page exists or 404s.
+        if version == "latest":
+            url = f"{self.url}/releases/latest"
+        else:
+            url = f"{self.url}/releases/tag/v{version}"
+        if self._budget_low(url):
+            fallback = self._fallback(version)
+            if fallback is not MISSING:
+                return fallback
+        try:
+            with self._request("HEAD", url, redirect=False) as response:
+                status = response.status
+                location = response.headers.get("Location", "")
+        except urllib.error.URLError as e:
+            if isinstance(e, urllib.error.HTTPError) and e.code == 404:
+                RESOLUTION_CACHE.set(version, None)
+                return None
+            fallback = self._fallback(version)
+            if fallback is MISSING:
+                raise
+            return fallback
+
+        if version != "latest":
+            v = version if status == 200 else None
+        elif status in REDIRECT_CODES and "/releases/tag/v" in location:
+            v = location.rstrip("/").rsplit("/", 1)[-1][1:]
+        else:
+            v = None
+        resolved = {version: v}
+        if v is not None:
+            resolved[v] = v
+        RESOLUTION_CACHE.update(resolved)
+        return v
+
+    def list_versions(self, limit: int = 10, refresh: bool = False) -> List[str]:
+        versions = sort_versions(
+            (tag.lstrip("v") for tag in self.tags(refresh)), reverse=True
+        )
+        return versions[:limit] if limit else versions
+
+    def tags(self, refresh: bool = False) -> List[str]:
+        index = TAG_INDEX.get("tags")
+        if index is not MISSING and not refresh:
+            return index["tags"]
+
+        known = TAG_INDEX.get("tags", stale=True)
+        known = {"etag": None, "tags": []} if known is MISSING else known
+        if known["tags"] and self._budget_low(self.api_url):
+            return known["tags"]
+        try:
+            index = self._fetch_tags(known)
+        except urllib.error.URLError:
+            if not known["tags"]:
+                raise
+            return known["tags"]
+        TAG_INDEX.set("tags", index)
+        return index["tags"]
+
+    def _fetch_tags(self, known: Dict[str, Any]) -> Dict[str, Any]:
+        headers = {"Accept": "application/vnd.github+json"}
+        if known["etag"]:
+            headers["If-None-Match"] = known["etag"]
+
+        url = f"{self.api_url}/tags?per_page={TAGS_PER_PAGE}"
+        seen = set(known["tags"])
+        etag, new, first_page = None, [], True
+        while url:
+            with self._request("GET", url, headers=headers) as response:
+                if response.status == 304:
+                    return known
+                if first_page:
+                    etag = response.headers.get("ETag")
+                page = [tag["name"] for tag in json.loads(response.read())]
+                match = _NEXT_LINK.search(response.headers.get("Link", ""))
+                url = match.group(1) if match else None
+
+            fresh = list(itertools.takewhile(lambda tag: tag not in seen, page))
+            new.extend(fresh)
+            if len(fresh) < len(page):
+                break
+            headers.pop("If-None-Match", None)
+            first_page = False
+
+        return {"etag": etag, "tags": new + known["tags"]}
+
+    def _request(
+        self, method: str, url: str, headers: Dict[str, str] | None = None, **kwargs
+    ) -> Any:
+        host = urllib.parse.urlsplit(url).netloc
+        if RATE_LIMITS.remaining(host) == 0:
+            raise RateLimited(f"{host} rate limit exhausted")
+        headers = dict(headers or {})
+        if self.token and url.startswith(self.api_url):
+            headers["Authorization"] = f"Bearer {self.token}"
+        try:
+            response = SESSION.request(
+                method, url, headers, retries=TGENV_HTTP_RETRIES, **kwargs
+            )
+        except urllib.error.HTTPError as e:
+            RATE_LIMITS.update(host, e.headers)
+            raise
+        RATE_LIMITS.update(host, response.headers)
+        return response
+
+    def _budget_low(self, url: str) -> bool:
+        # Close to the limit, answers that are already cached are used even
+        # if stale, leaving the remaining requests for what is not.
+        remaining = RATE_LIMITS.remaining(urllib.parse.urlsplit(url).netloc)
+        return remaining is not None and remaining <= TGENV_RATE_LIMIT_RESERVE
+
+    def _fallback(self, version: str) -> Any:
+        stale = RESOLUTION_CACHE.get(version, stale=True)
+        if stale is not MISSING:
+            return stale
+        index = TAG_INDEX.get("tags", stale=True)
+        if index is not MISSING:
+            v = _resolve_in(version, (tag.lstrip("v") for tag in index["tags"]))
+            if v is not None:
+                return v
+        return MISSING
+
+
+class MirrorSource(GitHubSource):
+    def __init__(self, url: str) -> None:
+        super().__init__(url, api_url=url)
+
+    def resolve(self, version: str) -> str | None:
+        return _resolve_in(version, self.list_versions(limit=0))
+
+    def list_versions(self, limit: int = 10, refresh: bool = False) -> List[str]:
+        try:
+            response = SESSION.request("GET", f"{self.url}/index.json")
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return []
+            raise
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, FileNotFoundError):
+                return []
+            raise
+
+        versions = json.loads(response.read())["versions"]
+        return versions[:limit] if limit else versions
+
+
+def _resolve_in(version: str, versions: Iterable[str]) -> str | None:
+    versions = list(versions)
+    if version != "latest":
+        return version if version in versions else None
+
+    releases = []
+    for v in versions:
+        try:
+            if not Version(v).is_prerelease:
+                releases.append(v)
+        except InvalidVersion:
+            continue
+    return max(releases, key=Version) if releases else None
+
+
+def is_offline() -> bool:
+    return OFFLINE
+
+
+def set_offline(offline: bool = True) -> None:
+    global OFFLINE
+    OFFLINE = offline
+
+
+def offline_versions() -> List[str]:
+    # Everything known without asking a server: installed versions plus the
+    # tag index from the last online listing, however old it is.
+    index = TAG_INDEX.get("tags", stale=True)
+    tags = [] if index is MISSING else [tag.lstrip("v") for tag in index["tags"]]
+    return sort_versions({*installed_versions(), *tags}, reverse=True)
+
+
+def get_source(mirror: str = TGENV_MIRROR) -> GitHubSource:
+    if not mirror:
+        return GitHubSource()
+    if "://" not in mirror:
+        mirror = pathlib.Path(mirror).expanduser().resolve().as_uri()
+    return MirrorSource(mirror)
+
+
+SOURCE = get_source()
+
+
+def check_remote_version(version: str) -> str | None:
+    if OFFLINE:
+        installed = _resolve_in(version, installed_versions())
+        return installed or _resolve_in(version, offline_versions())
+    return SOURCE.resolve(version)
+
+
+def get_remote_versions(limit: int = 10, refresh: bool = False) -> List[str]:
+    if OFFLINE:
+        versions = offline_versions()
+        return versions[:limit] if limit else versions
+    return SOURCE.list_versions(limit, refresh)
@@ -0,0 +1,183 @@
+import os
+import pathlib
+import time
+import zlib
+
+from . import tracing
+from .manifest import Manifest
+from .settings import (_BIN_FILE_NAME, CACHE_DIR, TGENV_OBJECTS_DIR,
+                       TGENV_ROOT, TGENV_VERSION_FILE_TTL, VERSIONS_DIR)
+
+VERSION_FILE_NAME = ".terragrunt-version"
+CONSTRAINT_CHARS = frozenset("<>=!~,*xX ")
+VERSION_FILE_MEMO_DIR = CACHE_DIR / "version-files"
+VERSION_FILE_MEMO_MAX = 256
+
+
+class InvalidVersionFile(ValueError):
+    pass
+
+
+def parse_version(v: str) -> str:
+    return v
+
+
+def get_version(
+    version: str = "latest", directory: pathlib.Path | None = None
+) -> str | None:
+    with tracing.span("resolve", requested=version) as span:
+        v = get_version_from_file(directory)
+        if v is None:
+            from .remote import check_remote_version
+
+            span.set(source="remote")
+            v = check_remote_version(version)
+        elif is_constraint(v):
+            from .constraints import Constraint, InvalidConstraint
+
+            span.set(source="constraint", constraint=v)
+            try:
+                v = Constraint(v).resolve(installed_versions()) or v
+            except InvalidConstraint:
+                path = get_version_file(directory)
+                raise InvalidVersionFile(
+                    f"Invalid version constraint in {path}: '{v}'"
+                ) from None
+        else:
+            span.set(source="file")
+        span.set(version=v)
+    return parse_version(v)
+
+
+def is_constraint(version: str) -> bool:
+    return not CONSTRAINT_CHARS.isdisjoint(version)
+
+
+def installed_versions() -> list[str]:
+    return list(get_manifest().load())
+
+
+def get_version_from_file(directory: pathlib.Path | None = None) -> str | None:
+    path = get_version_file(directory)
+    if path:
+        with open(path, "r") as f:
+            return f.read().strip()
+    return None
+
+
+def get_version_file(directory: pathlib.Path | None = None) -> pathlib.Path | None:
+    local_version = find_version_file(directory or pathlib.Path.cwd())
+    if local_version:
+        return local_version
+
+    global_version = pathlib.Path.home() / VERSION_FILE_NAME
+    if global_version.exists():
+        return global_version
+
+    recent_version = TGENV_ROOT / "version"
+    if recent_version.exists():
+        return recent_version
+
+    return None
+
+
+def find_version_file(directory: pathlib.Path) -> pathlib.Path | None:
+    # The memo entry is validated against the directory's own mtime and the
+    # existence of the file it points at, so a hit costs two stat calls and
+    # one small read regardless of depth. Files created by hand in a parent
+    # directory are picked up once the entry is older than
+    # TGENV_VERSION_FILE_TTL; `tgenv use` clears the memo right away.
+    try:
+        mtime = directory.stat().st_mtime_ns
+    except OSError:
+        return _walk_version_files(directory)
+
+    # Memo entries are four plain-text lines (mtime, time, directory, path)
+    # so the shim does not have to import json or hashlib to read them.
+    memo_path = VERSION_FILE_MEMO_DIR / f"{zlib.crc32(bytes(directory)):08x}"
+    try:
+        with open(memo_path, "r") as f:
+            memo_mtime, memo_time, memo_directory, memo_file = f.read().split("\n")
+        if (
+            memo_directory == str(directory)
+            and int(memo_mtime) == mtime
+            and time.time() - float(memo_time) < TGENV_VERSION_FILE_TTL
+            and (not memo_file or os.path.exists(memo_file))
+        ):
+            return pathlib.Path(memo_file) if memo_file else None
+    except (OSError, ValueError):
+        pass
+
+    path = _walk_version_files(directory)
+    try:
+        VERSION_FILE_MEMO_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = memo_path.with_name(f"{memo_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(f"{mtime}\n{time.time()}\n{directory}\n{path or ''}")
+        os.replace(tmp_path, memo_path)
+        _prune_version_file_memo()
+    except OSError:
+        pass
+    return path
+
+
+def _prune_version_file_memo() -> None:
+    # One entry per directory ever resolved adds up where every CI job runs
+    # in a fresh workspace path. Past the cap, expired entries (which would
+    # never be trusted again) and the oldest beyond half the cap are dropped,
+    # so listing the directory stays rare.
+    entries = list(os.scandir(VERSION_FILE_MEMO_DIR))
+    if len(entries) <= VERSION_FILE_MEMO_MAX:
+        return
+    expired = time.time() - TGENV_VERSION_FILE_TTL
+    mtimes = []
+    for entry in entries:
+        try:
+            mtimes.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            pass
+    mtimes.sort(reverse=True)
+    for i, (mtime, path) in enumerate(mtimes):
+        if i >= VERSION_FILE_MEMO_MAX // 2 or mtime < expired:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def clear_version_file_memo() -> None:
+    import shutil
+
+    shutil.rmtree(VERSION_FILE_MEMO_DIR, ignore_errors=True)
+
+
+def _walk_version_files(directory: pathlib.Path) -> pathlib.Path | None:
+    for parent in (directory, *directory.parents):
+        candidate = parent / VERSION_FILE_NAME
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def get_manifest() -> Manifest:
+    return Manifest(VERSIONS_DIR)
+
+
+def is_version_installed(version: str) -> bool:
+    return version in get_manifest().load()
+
+
+def get_version_path(version: str) -> pathlib.Path:
+    return VERSIONS_DIR / version / _BIN_FILE_NAME
+
+
+def get_lock_path(version: str) -> pathlib.Path:
+    # Outside the versions directory, whose mtime keys the manifest.
+    return VERSIONS_DIR.with_name("locks") / f"{version}.lock"
+
+
+def get_object_path(digest: str) -> pathlib.Path:
+    # TGENV_OBJECTS_DIR lets several roots on one filesystem share binaries.
+    if TGENV_OBJECTS_DIR:
+        return pathlib.Path(TGENV_OBJECTS_DIR) / digest
+    return VERSIONS_DIR.with_name("objects") / digest
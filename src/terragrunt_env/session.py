@@ -0,0 +1,269 @@
+import email.utils
+import http.client
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Tuple
+
+from . import tracing
+from .settings import TGENV_DOWNLOAD_TIMEOUT
+
+MAX_REDIRECTS = 10
+POOL_SIZE = 8
+REDIRECT_CODES = frozenset((301, 302, 303, 307, 308))
+RETRY_CODES = frozenset((429, 500, 502, 503, 504))
+BACKOFF_BASE = 0.5
+MAX_BACKOFF = 8.0
+MAX_RETRY_WAIT = 30.0
+
+PoolKey = Tuple[str, str]
+
+
+class Response:
+    def __init__(
+        self,
+        session: "Session",
+        key: PoolKey,
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        url: str,
+    ) -> None:
+        self._session = session
+        self._key = key
+        self._conn: http.client.HTTPConnection | None = conn
+        self._response = response
+        self.url = url
+
+    @property
+    def status(self) -> int:
+        return self._response.status
+
+    @property
+    def reason(self) -> str:
+        return self._response.reason
+
+    @property
+    def headers(self) -> http.client.HTTPMessage:
+        return self._response.headers
+
+    @property
+    def length(self) -> int | None:
+        # Bytes of body still to read; None when the server did not say.
+        return self._response.length
+
+    def read(self, amt: int | None = None) -> bytes:
+        data = self._response.read(amt)
+        if self._response.isclosed():
+            self.close()
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        n = self._response.readinto(buffer)
+        if self._response.isclosed():
+            self.close()
+        return n
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._response.length == 0:
+            # HEAD and empty responses are complete without a read.
+            self._response.read()
+        # Only a connection whose response was read to the end can carry the
+        # next request; anything else is closed rather than returned.
+        if self._response.isclosed() and not self._response.will_close:
+            self._session._release(self._key, conn)
+        else:
+            self._response.close()
+            conn.close()
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class Session:
+    def __init__(self, pool_size: int = POOL_SIZE) -> None:
+        self.pool_size = pool_size
+        self._pools: Dict[PoolKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._context = None
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str] | None = None,
+        redirect: bool = True,
+        timeout: float = TGENV_DOWNLOAD_TIMEOUT,
+        retries: int = 0,
+    ) -> Any:
+        if not url.startswith(("http:", "https:")):
+            request = urllib.request.Request(url, headers=headers or {}, method=method)
+            return urllib.request.urlopen(request, timeout=timeout)
+
+        for attempt in range(retries + 1):
+            try:
+                return self._request(method, url, headers or {}, redirect, timeout)
+            except urllib.error.HTTPError as e:
+                delay = retry_delay(attempt, e.code, e.headers)
+                if attempt == retries or delay is None:
+                    raise
+            except urllib.error.URLError:
+                if attempt == retries:
+                    raise
+                delay = backoff(attempt)
+            tracing.incr("tgenv_http_retries_total")
+            time.sleep(delay)
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        redirect: bool,
+        timeout: float,
+    ) -> Response:
+        with tracing.span("http", method=method, url=url) as span:
+            for _ in range(MAX_REDIRECTS + 1):
+                response = self._send(method, url, headers, timeout)
+                location = response.headers.get("Location")
+                if not redirect or response.status not in REDIRECT_CODES:
+                    break
+                if not location:
+                    break
+                response.read()
+                response.close()
+                target = urllib.parse.urljoin(url, location)
+                if urllib.parse.urlsplit(target)[:2] != urllib.parse.urlsplit(url)[:2]:
+                    # Credentials are for the host they were given for, not
+                    # for wherever it redirects to (e.g. release asset CDNs).
+                    headers = {
+                        k: v for k, v in headers.items() if k.lower() != "authorization"
+                    }
+                url = target
+            span.set(status=response.status, final_url=url, bytes=response.length)
+        tracing.incr("tgenv_http_requests_total", status=str(response.status))
+
+        if response.status >= 400:
+            response.read()
+            response.close()
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None
+            )
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for conns in pools.values():
+            for conn in conns:
+                conn.close()
+
+    def _send(
+        self, method: str, url: str, headers: Dict[str, str], timeout: float
+    ) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        conn, reused = self._acquire(key, timeout)
+        try:
+            conn.request(method, path, headers=headers)
+            response = conn.getresponse()
+        except (ConnectionResetError, BrokenPipeError) as e:
+            conn.close()
+            if not reused:
+                raise urllib.error.URLError(e)
+            # The server dropped an idle keep-alive connection; GET and HEAD
+            # are safe to send again on a fresh one.
+            return self._send(method, url, headers, timeout)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise urllib.error.URLError(e)
+        return Response(self, key, conn, response, url)
+
+    def _acquire(
+        self, key: PoolKey, timeout: float
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            pool = self._pools.get(key)
+            conn = pool.pop() if pool else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+
+        tracing.incr("tgenv_http_connections_total")
+        scheme, netloc = key
+        if scheme == "https":
+            if self._context is None:
+                import ssl
+
+                self._context = ssl.create_default_context()
+            return (
+                http.client.HTTPSConnection(
+                    netloc, timeout=timeout, context=self._context
+                ),
+                False,
+            )
+        return http.client.HTTPConnection(netloc, timeout=timeout), False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            if len(pool) < self.pool_size:
+                pool.append(conn)
+                return
+        conn.close()
+
+
+def backoff(attempt: int) -> float:
+    # Full jitter, so a fleet of runners that failed together does not retry
+    # together.
+    return random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2**attempt))
+
+
+def retry_delay(attempt: int, status: int, headers: Any) -> float | None:
+    # Seconds to wait before retrying an error response, or None if it should
+    # not be retried: not transient, or the server asks for a longer pause
+    # than MAX_RETRY_WAIT.
+    headers = headers or {}
+    retry_after = parse_retry_after(headers.get("Retry-After"))
+    rate_limited = headers.get("X-RateLimit-Remaining") == "0"
+    if status not in RETRY_CODES and not (status == 403 and rate_limited):
+        return None
+    if retry_after is not None:
+        delay = retry_after
+    elif rate_limited:
+        delay = float(headers.get("X-RateLimit-Reset", 0)) - time.time()
+    else:
+        return backoff(attempt)
+    if delay > MAX_RETRY_WAIT:
+        return None
+    return max(delay, 0) + random.uniform(0, BACKOFF_BASE)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+SESSION = Session()
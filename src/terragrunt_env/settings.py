@@ -0,0 +1,37 @@
+import os
+import pathlib
+import sys
+
+from .daemon_client import default_socket_path
+from .location import tgenv_root
+
+TGENV_ROOT = pathlib.Path(tgenv_root())
+VERSIONS_DIR = TGENV_ROOT / "versions"
+CACHE_DIR = TGENV_ROOT / "cache"
+TGENV_OBJECTS_DIR = os.environ.get("TGENV_OBJECTS_DIR", "")
+TGENV_SHARED = os.environ.get("TGENV_SHARED", "") not in ("", "0")
+
+TGENV_CACHE_TTL = int(os.environ.get("TGENV_CACHE_TTL", 3600))
+TGENV_DOWNLOAD_RETRIES = int(os.environ.get("TGENV_DOWNLOAD_RETRIES", 3))
+TGENV_DOWNLOAD_SEGMENTS = int(os.environ.get("TGENV_DOWNLOAD_SEGMENTS", 1))
+TGENV_DOWNLOAD_TIMEOUT = float(os.environ.get("TGENV_DOWNLOAD_TIMEOUT", 30))
+TGENV_HTTP_RETRIES = int(os.environ.get("TGENV_HTTP_RETRIES", 3))
+TGENV_RATE_LIMIT_RESERVE = int(os.environ.get("TGENV_RATE_LIMIT_RESERVE", 10))
+TGENV_VERSION_FILE_TTL = int(os.environ.get("TGENV_VERSION_FILE_TTL", 60))
+TGENV_LOCK_TIMEOUT = float(os.environ.get("TGENV_LOCK_TIMEOUT", 600))
+TGENV_GC_MAX_BYTES = int(os.environ.get("TGENV_GC_MAX_BYTES", 0))
+TGENV_GC_MAX_COUNT = int(os.environ.get("TGENV_GC_MAX_COUNT", 0))
+TGENV_TRACE = os.environ.get("TGENV_TRACE", "")
+TGENV_METRICS_FILE = os.environ.get("TGENV_METRICS_FILE", "")
+TGENV_MIRROR = os.environ.get("TGENV_MIRROR", "")
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
+TGENV_OFFLINE = os.environ.get("TGENV_OFFLINE", "") not in ("", "0")
+
+TGENV_DAEMON_SOCKET = os.environ.get("TGENV_DAEMON_SOCKET", default_socket_path())
+
+TGENV_ARCH = os.environ.get("TGENV_ARCH", "")
+_OS = {"win32": "windows", "cygwin": "windows"}.get(
+    sys.platform, sys.platform.rstrip("0123456789")
+)
+_SUFFIX = "" if _OS != "windows" else ".exe"
+_BIN_FILE_NAME = f"terragrunt{_SUFFIX}"
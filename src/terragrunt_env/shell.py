@@ -0,0 +1,125 @@
+import shlex
+
+from .resolve import VERSION_FILE_NAME, get_manifest
+from .settings import _BIN_FILE_NAME, TGENV_ROOT
+
+SHELLS = ("bash", "zsh", "fish")
+
+# The hook runs before every prompt, so it must stay in shell builtins: it
+# walks up for the version file, reads it and the manifest's first line (the
+# versions directory mtime, which changes on every install and uninstall)
+# and does nothing more unless one of the three changed. An installed exact
+# version goes straight on PATH; anything else, such as a constraint, is
+# resolved by `tgenv which` once per change. Either way the version's
+# last-used time is refreshed so `tgenv gc` does not evict it, in the
+# background for the fast path.
+_POSIX_HOOK = """
+_tgenv_hook() {
+  local ret=$? dir=$PWD file= v= stamp= bin=
+  while :; do
+    if [[ -f $dir/$_TGENV_FILE ]]; then
+      file=$dir/$_TGENV_FILE
+      break
+    fi
+    [[ -z $dir ]] && break
+    dir=${dir%/*}
+  done
+  if [[ -z $file && -f $HOME/$_TGENV_FILE ]]; then
+    file=$HOME/$_TGENV_FILE
+  elif [[ -z $file && -f $_TGENV_ROOT/version ]]; then
+    file=$_TGENV_ROOT/version
+  fi
+  [[ -n $file ]] && read -r v < "$file"
+  [[ -f $_TGENV_MANIFEST ]] && read -r stamp < "$_TGENV_MANIFEST"
+  [[ "$file|$v|$stamp" == "$_TGENV_KEY" ]] && return $ret
+  _TGENV_KEY="$file|$v|$stamp"
+
+  if [[ -n $v && -x $_TGENV_VERSIONS/$v/$_TGENV_BIN ]]; then
+    bin=$_TGENV_VERSIONS/$v
+    (command tgenv which --touch "$v" >/dev/null 2>&1 &)
+  elif [[ -n $v ]]; then
+    bin=$(command tgenv which --touch 2>/dev/null) && bin=${bin%/*} || bin=
+  fi
+  if [[ -n $_TGENV_PATH ]]; then
+    PATH=":$PATH:"
+    PATH=${PATH//":$_TGENV_PATH:"/:}
+    PATH=${PATH#:}
+    PATH=${PATH%:}
+  fi
+  _TGENV_PATH=$bin
+  [[ -n $bin ]] && PATH=$bin:$PATH
+  return $ret
+}
+"""
+
+_REGISTER = {
+    "bash": """
+if [[ ";${PROMPT_COMMAND[*]:-};" != *";_tgenv_hook;"* ]]; then
+  PROMPT_COMMAND="_tgenv_hook${PROMPT_COMMAND:+;$PROMPT_COMMAND}"
+fi
+_tgenv_hook
+""",
+    "zsh": """
+autoload -Uz add-zsh-hook
+add-zsh-hook precmd _tgenv_hook
+_tgenv_hook
+""",
+}
+
+_FISH_HOOK = """
+function _tgenv_hook --on-event fish_prompt
+  set -l dir $PWD
+  set -l file
+  set -l v
+  set -l stamp
+  set -l bin
+  while true
+    if test -f "$dir/$_tgenv_file"
+      set file "$dir/$_tgenv_file"
+      break
+    end
+    test -z "$dir"; and break
+    set dir (string replace -r '/[^/]*$' '' -- $dir)
+  end
+  if test -z "$file" -a -f "$HOME/$_tgenv_file"
+    set file "$HOME/$_tgenv_file"
+  else if test -z "$file" -a -f "$_tgenv_root/version"
+    set file "$_tgenv_root/version"
+  end
+  test -n "$file"; and read v < $file
+  test -f "$_tgenv_manifest"; and read stamp < $_tgenv_manifest
+  test "$file|$v|$stamp" = "$_tgenv_key"; and return
+  set -g _tgenv_key "$file|$v|$stamp"
+
+  if test -n "$v" -a -x "$_tgenv_versions/$v/$_tgenv_bin"
+    set bin "$_tgenv_versions/$v"
+    command tgenv which --touch $v >/dev/null 2>&1 &
+    disown 2>/dev/null
+  else if test -n "$v"
+    set bin (command tgenv which --touch 2>/dev/null); or set bin
+    set bin (string replace -r '/[^/]*$' '' -- $bin)
+  end
+  if set -q _tgenv_path[1]
+    set -l i (contains -i -- $_tgenv_path $PATH); and set -e PATH[$i]
+  end
+  set -g _tgenv_path $bin
+  test -n "$bin"; and set -gx PATH $bin $PATH
+end
+_tgenv_hook
+"""
+
+
+def hook(shell: str) -> str:
+    manifest = get_manifest()
+    settings = {
+        "file": VERSION_FILE_NAME,
+        "root": str(TGENV_ROOT),
+        "versions": str(manifest.versions_dir),
+        "manifest": str(manifest.path),
+        "bin": _BIN_FILE_NAME,
+    }
+    if shell == "fish":
+        lines = [f"set -g _tgenv_{k} {shlex.quote(v)}" for k, v in settings.items()]
+        return "\n".join(lines) + "\n" + _FISH_HOOK
+    lines = [f"_TGENV_{k.upper()}={shlex.quote(v)}" for k, v in settings.items()]
+    return "\n".join(lines) + "\n" + _POSIX_HOOK + _REGISTER[shell]
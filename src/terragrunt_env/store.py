@@ -0,0 +1,93 @@
+import os
+import pathlib
+import shutil
+
+from .resolve import get_object_path
+
+# Installed binaries are hard links to objects/<sha256>, so a version that is
+# installed again, or installed under another root sharing the objects
+# directory, reuses the bytes already on disk instead of downloading them.
+# The link count doubles as a reference count: an object nothing else links
+# to is removed with the last version using it.
+
+
+def publish(path: pathlib.Path, digest: str) -> None:
+    if not digest:
+        return
+    obj = get_object_path(digest)
+    obj.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(path, obj)
+    except FileExistsError:
+        # Already stored, e.g. by a concurrent install under another root:
+        # keep one copy on disk.
+        if not _same_file(path, obj):
+            try:
+                link(obj, path)
+            except OSError:
+                pass
+    except OSError:
+        # Another filesystem, or one without hard links: no deduplication.
+        pass
+
+
+def restore(digest: str, path: pathlib.Path) -> bool:
+    obj = get_object_path(digest)
+    if not digest or not obj.exists():
+        return False
+    try:
+        link(obj, path)
+    except OSError:
+        return False
+    return True
+
+
+def release(digest: str) -> None:
+    obj = get_object_path(digest)
+    try:
+        if digest and obj.stat().st_nlink == 1:
+            obj.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def link(src: pathlib.Path, path: pathlib.Path) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.link")
+    try:
+        os.link(src, tmp_path)
+    except FileExistsError:
+        tmp_path.unlink()
+        os.link(src, tmp_path)
+    except OSError:
+        _clone(src, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _clone(src: pathlib.Path, dst: pathlib.Path) -> None:
+    # copy_file_range shares extents on filesystems with reflinks (btrfs,
+    # XFS) and copies in the kernel elsewhere.
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while copied < size:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError:
+                copied = 0
+        if copied < size:
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copymode(src, dst)
+
+
+def _same_file(a: pathlib.Path, b: pathlib.Path) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
@@ -0,0 +1,138 @@
+import atexit
+import os
+import sys
+import time
+
+from .settings import TGENV_METRICS_FILE, TGENV_TRACE
+
+_trace_target = TGENV_TRACE
+_metrics_file = TGENV_METRICS_FILE
+_counters: dict[str, float] = {}
+_flush_registered = False
+
+
+class _NullSpan:
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def set(self, **attrs: object) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "wall")
+
+    def __init__(self, name: str, attrs: dict[str, object]) -> None:
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> "Span":
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        duration = time.perf_counter() - self.start
+        if exc is not None:
+            self.attrs["error"] = repr(exc)
+        emit(self.name, self.wall, duration, **self.attrs)
+
+    def set(self, **attrs: object) -> None:
+        self.attrs.update(attrs)
+
+
+def enabled() -> bool:
+    return bool(_trace_target)
+
+
+def enable(target: str = "stderr") -> None:
+    global _trace_target
+    _trace_target = target
+    os.environ["TGENV_TRACE"] = target
+
+
+def span(name: str, **attrs: object) -> "Span | _NullSpan":
+    if not _trace_target:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def emit(name: str, start: float, duration: float, **attrs: object) -> None:
+    if not _trace_target:
+        return
+    import json
+
+    record = {"span": name, "start": start, "duration": duration, "pid": os.getpid()}
+    record.update(attrs)
+    line = json.dumps(record, default=str) + "\n"
+    if _trace_target in ("1", "stderr"):
+        _write(sys.stderr, line)
+    else:
+        with open(_trace_target, "a") as f:
+            _write(f, line)
+
+
+def _write(stream, line: str) -> None:
+    stream.write(line)
+    stream.flush()
+
+
+def incr(name: str, value: float = 1, **labels: str) -> None:
+    if not _metrics_file:
+        return
+    if labels:
+        name += "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+    global _flush_registered
+    if not _flush_registered:
+        atexit.register(flush_metrics)
+        _flush_registered = True
+    _counters[name] = _counters.get(name, 0) + value
+
+
+def _format_value(value: float) -> str:
+    # Written exactly: the file is read back and added to on every flush, so
+    # any rounding here would compound.
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def flush_metrics() -> None:
+    # Counters are added to whatever the file already holds, so the textfile
+    # accumulates across tgenv and shim processes. Concurrent writers may
+    # lose an increment; the file itself is always replaced atomically.
+    if not _metrics_file or not _counters:
+        return
+    totals: dict[str, float] = {}
+    try:
+        with open(_metrics_file, "r") as f:
+            for line in f:
+                if line.strip() and not line.startswith("#"):
+                    sample, _, value = line.rpartition(" ")
+                    totals[sample] = float(value)
+    except (OSError, ValueError):
+        totals = {}
+
+    for sample, value in _counters.items():
+        totals[sample] = totals.get(sample, 0) + value
+    _counters.clear()
+
+    lines, typed = [], set()
+    for sample in sorted(totals):
+        metric = sample.split("{", 1)[0]
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{sample} {_format_value(totals[sample])}")
+
+    tmp_path = f"{_metrics_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, _metrics_file)
+    except OSError:
+        pass
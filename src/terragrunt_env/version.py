@@ -1,8 +1,6 @@
-import itertools
+import functools
 import re
-from typing import Callable, NamedTuple, SupportsInt, Tuple
-
-from ._structures import InfinityType, NegativeInfinity, PositiveInfinity
+from typing import Callable, Iterable, List, NamedTuple, SupportsInt, Tuple
 
 _VERSION_PATTERN = r"""
     v?
@@ -33,10 +31,17 @@ _VERSION_PATTERN = r"""
     )
 """
 
-CmpPrePostDevType = InfinityType | Tuple[str, int]
-CmpKey = Tuple[Tuple[int, ...], CmpPrePostDevType, CmpPrePostDevType, CmpPrePostDevType]
+CmpKey = Tuple[Tuple[int, ...], int, int, int, int, int]
 VersionComparisonMethod = Callable[[CmpKey, CmpKey], bool]
 
+VERSION_CACHE_SIZE = 4096
+
+# Normalized prerelease labels in sort order, between a dev-only release and
+# the final release.
+_PRE_DEV_ONLY, _PRE_FINAL = -1, 3
+_PRE_RANKS = {"a": 0, "b": 1, "rc": 2}
+_DEV, _DEV_NONE = 0, 1
+
 
 class _Version(NamedTuple):
     release: Tuple[int, ...]
@@ -50,17 +55,41 @@ class InvalidVersion(ValueError):
 
 
 class Version:
+    __slots__ = ("_version", "_key")
+
     _key: CmpKey
     _regex = re.compile(
         r"^\s*" + _VERSION_PATTERN + r"\s*$", re.VERBOSE | re.IGNORECASE
     )
 
-    def __init__(self, version: str) -> None:
-        match = self._regex.search(version)
+    def __new__(cls, version: str) -> "Version":
+        # Instances are immutable, so equal strings share one interned object.
+        return _intern(cls, version)
+
+    @classmethod
+    def _parse(cls, version: str) -> "Version":
+        self = object.__new__(cls)
+        release = _parse_release(version)
+        if release is not None:
+            self._version = _Version(release=release, pre=None, post=None, dev=None)
+        else:
+            self._version = cls._parse_pattern(version)
+
+        self._key = _cmpkey(
+            self._version.release,
+            self._version.pre,
+            self._version.post,
+            self._version.dev,
+        )
+        return self
+
+    @classmethod
+    def _parse_pattern(cls, version: str) -> _Version:
+        match = cls._regex.search(version)
         if not match:
             raise InvalidVersion(f"Invalid version: '{version}'")
 
-        self._version = _Version(
+        return _Version(
             release=tuple(int(i) for i in match.group("release").split(".")),
             pre=_parse_label_version(
                 match.group("pre_label"), match.group("pre_number")
@@ -74,12 +103,20 @@ class Version:
             ),
         )
 
-        self._key = _cmpkey(
-            self._version.release,
-            self._version.pre,
-            self._version.post,
-            self._version.dev,
-        )
+    @classmethod
+    def parse_many(
+        cls, versions: Iterable[str], strict: bool = True
+    ) -> List["Version"]:
+        if strict:
+            return [cls(v) for v in versions]
+
+        parsed = []
+        for v in versions:
+            try:
+                parsed.append(cls(v))
+            except InvalidVersion:
+                continue
+        return parsed
 
     def __hash__(self) -> int:
         return hash(self._key)
@@ -154,6 +191,36 @@ class Version:
         return self.release[2] if len(self.release) >= 3 else 0
 
 
+def sort_versions(versions: Iterable[str], reverse: bool = False) -> List[str]:
+    # Invalid versions are dropped. Sorting on the precomputed keys avoids a
+    # Python-level __lt__ call per comparison.
+    keyed = []
+    for v in versions:
+        try:
+            keyed.append((Version(v)._key, v))
+        except InvalidVersion:
+            continue
+    keyed.sort(reverse=reverse)
+    return [v for _, v in keyed]
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _intern(cls: type, version: str) -> Version:
+    return cls._parse(version)
+
+
+def _parse_release(version: str) -> Tuple[int, ...] | None:
+    if version[:1] in ("v", "V"):
+        version = version[1:]
+    digits = version.replace(".", "")
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    parts = version.split(".")
+    if "" in parts:
+        return None
+    return tuple(map(int, parts))
+
+
 def _parse_label_version(
     label: str | None, number: str | bytes | SupportsInt | None
 ) -> tuple[str, int] | None:
@@ -185,25 +252,26 @@ def _cmpkey(
     post: Tuple[str, int] | None,
     dev: Tuple[str, int] | None,
 ) -> CmpKey:
-    _release = tuple(
-        reversed(list(itertools.dropwhile(lambda x: x == 0, reversed(release))))
-    )
-
-    if pre is None and post is None and dev is not None:
-        _pre = NegativeInfinity
-    elif pre is None:
-        _pre = PositiveInfinity
-    else:
-        _pre = pre
-
-    if post is None:
-        _post = NegativeInfinity
+    # A flat tuple of ints, so sorting never leaves C. Trailing zeros of the
+    # release are dropped, a dev-only release sorts before any prerelease and
+    # a final release after all of them; no post sorts before post0 and no
+    # dev after any dev number.
+    end = len(release)
+    while end and release[end - 1] == 0:
+        end -= 1
+
+    if pre is not None:
+        pre_rank, pre_number = _PRE_RANKS[pre[0]], pre[1]
+    elif post is None and dev is not None:
+        pre_rank, pre_number = _PRE_DEV_ONLY, 0
     else:
-        _post = post
-
-    if dev is None:
-        _dev = PositiveInfinity
-    else:
-        _dev = dev
-
-    return _release, _pre, _post, _dev
+        pre_rank, pre_number = _PRE_FINAL, 0
+
+    return (
+        release[:end],
+        pre_rank,
+        pre_number,
+        -1 if post is None else post[1],
+        _DEV_NONE if dev is None else _DEV,
+        0 if dev is None else dev[1],
+    )
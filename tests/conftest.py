@@ -1,12 +1,38 @@
+import os
 import shutil
+import tempfile
 
 import pytest
 
-from terragrunt_env.helper import TGENV_ROOT, VERSIONS_DIR
+# Settings are read at import time, so point the store at a scratch directory
+# before anything imports terragrunt_env; the tests must never touch the
+# developer's real installs. Subprocesses inherit it too.
+os.environ["TGENV_ROOT"] = tempfile.mkdtemp(prefix="tgenv-test-")
+os.environ.pop("TGENV_OBJECTS_DIR", None)
+os.environ.pop("TGENV_SHARED", None)
+
+from fake_github import FakeGitHub  # noqa: E402
+
+from terragrunt_env import resolve  # noqa: E402
 
 
 @pytest.fixture(scope="session", autouse=True)
 def clean_up():
     yield
-    (TGENV_ROOT / "version").unlink(missing_ok=True)
-    shutil.rmtree(VERSIONS_DIR)
+    shutil.rmtree(os.environ["TGENV_ROOT"], ignore_errors=True)
+
+
+@pytest.fixture
+def versions_dir(tmp_path, monkeypatch):
+    versions_dir = tmp_path / "versions"
+    versions_dir.mkdir()
+    monkeypatch.setattr(resolve, "VERSIONS_DIR", versions_dir)
+    monkeypatch.setattr(resolve, "VERSION_FILE_MEMO_DIR", tmp_path / "memo")
+    return versions_dir
+
+
+@pytest.fixture
+def fake_github():
+    server = FakeGitHub().start()
+    yield server
+    server.stop()
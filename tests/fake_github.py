@@ -0,0 +1,258 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+REPO = "gruntwork-io/terragrunt"
+
+
+class FakeGitHub:
+    def __init__(self) -> None:
+        self.assets: Dict[str, bytes] = {}
+        self.tags: List[str] = []
+        self.redirects: Dict[str, str] = {}
+        self.accept_ranges = True
+        self.latency = 0.0
+        self.bandwidth: int | None = None
+        self.drop_after: int | None = None
+        self.drops = 0
+        self.drop_idle = False
+        self.faults: List[List] = []
+        self.error_rate = 0.0
+        self.error_status = 503
+        self.retry_after: str | None = None
+        self.errors = 0
+        self.rate_limit: int | None = None
+        self.rate_limit_reset = 0.0
+        self.connections = 0
+        self.requests: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGitHub":
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.01,), daemon=True
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def repo_url(self) -> str:
+        return f"{self.url}/{REPO}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/repos/{REPO}"
+
+    def add_asset(self, path: str, data: bytes) -> str:
+        self.assets[path] = data
+        return self.url + path
+
+    def publish(
+        self, version: str, data: bytes, os_name: str = "linux", arch: str = "amd64"
+    ) -> None:
+        # A release as the installer sees it: a tag, a binary and SHA256SUMS.
+        # The most recently published release is "latest".
+        name = f"terragrunt_{os_name}_{arch}"
+        prefix = f"/{REPO}/releases/download/v{version}"
+        self.add_asset(f"{prefix}/{name}", data)
+        self.add_asset(
+            f"{prefix}/SHA256SUMS",
+            f"{hashlib.sha256(data).hexdigest()}  {name}\n".encode(),
+        )
+        self.tags.insert(0, f"v{version}")
+
+    def fail(self, status: int, count: int = 1, path: str = "") -> None:
+        # The next `count` requests whose path starts with `path` get `status`.
+        self.faults.append([path, status, count])
+
+    def _take_fault(self, path: str) -> int | None:
+        with self._lock:
+            for fault in self.faults:
+                if path.startswith(fault[0]) and fault[2] > 0:
+                    fault[2] -= 1
+                    self.errors += 1
+                    return fault[1]
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return self.error_status
+            return None
+
+    def _take_drop(self) -> bool:
+        with self._lock:
+            if self.drops > 0:
+                self.drops -= 1
+                return True
+            return False
+
+
+def _handler(fake: FakeGitHub) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with fake._lock:
+                fake.connections += 1
+
+        def do_HEAD(self):
+            self._handle("HEAD")
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def _handle(self, method: str) -> None:
+            fake.requests.append({"method": method, "path": self.path, **self.headers})
+            time.sleep(fake.latency)
+            url = urllib.parse.urlsplit(self.path)
+            status = fake._take_fault(self.path)
+            if status is not None:
+                self._send_fault(status)
+            elif url.path.startswith("/repos/") and not self._take_budget():
+                self._send_fault(403)
+            elif url.path == f"/repos/{REPO}/tags":
+                self._send_tags(urllib.parse.parse_qs(url.query))
+            elif url.path.startswith(f"/{REPO}/releases/") and (
+                url.path.endswith("/latest") or "/releases/tag/" in url.path
+            ):
+                self._send_release(url.path.rsplit("/", 1)[-1])
+            elif self.path in fake.redirects:
+                self.send_response(302)
+                self.send_header("Location", fake.redirects[self.path])
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.path in fake.assets:
+                self._send_asset(fake.assets[self.path], body=method == "GET")
+            else:
+                self.send_error(404)
+            if fake.drop_idle:
+                # Keep-alive was advertised, but the socket is closed anyway,
+                # like a server timing out an idle connection.
+                self.close_connection = True
+
+        def _take_budget(self) -> bool:
+            # Like api.github.com: every response reports the budget left,
+            # and once it is spent requests are refused with a 403.
+            if fake.rate_limit is None:
+                return True
+            with fake._lock:
+                allowed = fake.rate_limit > 0
+                fake.rate_limit = max(fake.rate_limit - 1, 0)
+            return allowed
+
+        def send_response(self, code, message=None):
+            super().send_response(code, message)
+            if fake.rate_limit is not None and self.path.startswith("/repos/"):
+                self.send_header("X-RateLimit-Remaining", str(fake.rate_limit))
+                self.send_header("X-RateLimit-Reset", str(int(fake.rate_limit_reset)))
+
+        def _send_fault(self, status: int) -> None:
+            self.send_response(status)
+            if fake.retry_after is not None:
+                self.send_header("Retry-After", fake.retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _send_release(self, tag: str) -> None:
+            if tag == "latest" and fake.tags:
+                self.send_response(302)
+                self.send_header(
+                    "Location", f"{fake.repo_url}/releases/tag/{fake.tags[0]}"
+                )
+            elif tag in fake.tags:
+                self.send_response(200)
+            else:
+                self.send_error(404)
+                return
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _send_tags(self, query: Dict[str, List[str]]) -> None:
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            names = fake.tags[(page - 1) * per_page : page * per_page]
+            data = json.dumps([{"name": name} for name in names]).encode()
+            etag = f'"{hashlib.sha1(data).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            if page * per_page < len(fake.tags):
+                next_url = f"{fake.api_url}/tags?per_page={per_page}&page={page + 1}"
+                self.send_header("Link", f'<{next_url}>; rel="next"')
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_asset(self, data: bytes, body: bool) -> None:
+            start, end = 0, len(data) - 1
+            range_header = self.headers.get("Range")
+            match = re.fullmatch(r"bytes=(\d+)-(\d*)", range_header or "")
+            if fake.accept_ranges and match:
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), end)
+                if start > end:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(data)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            else:
+                self.send_response(200)
+            if fake.accept_ranges:
+                self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            if not body:
+                return
+
+            chunk = data[start : end + 1]
+            if (
+                fake.drop_after is not None
+                and len(chunk) > fake.drop_after
+                and fake._take_drop()
+            ):
+                self._write(chunk[: fake.drop_after])
+                self.close_connection = True
+                return
+            self._write(chunk)
+
+        def _write(self, data: bytes) -> None:
+            if fake.bandwidth is None:
+                self.wfile.write(data)
+                return
+            step = max(fake.bandwidth // 100, 1)
+            for i in range(0, len(data), step):
+                self.wfile.write(data[i : i + step])
+                self.wfile.flush()
+                time.sleep(step / fake.bandwidth)
+
+    return Handler
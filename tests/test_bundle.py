@@ -0,0 +1,110 @@
+import hashlib
+import io
+import tarfile
+
+import pytest
+
+from terragrunt_env import bundle, resolve
+
+
+def _install(version):
+    path = resolve.get_version_path(version)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(version.encode() * 1000)
+    path.chmod(0o755)
+    resolve.get_manifest().add(version, hashlib.sha256(path.read_bytes()).hexdigest())
+
+
+@pytest.mark.parametrize("compression", ["", "gz", "xz"])
+def test_round_trip(tmp_path, versions_dir, monkeypatch, compression):
+    _install("0.54.0")
+    _install("0.55.1")
+    archive = tmp_path / "bundle.tar"
+    assert bundle.export_bundle(archive, [], compression) == ["0.54.0", "0.55.1"]
+
+    monkeypatch.setattr(resolve, "VERSIONS_DIR", tmp_path / "restored")
+    imported, skipped = bundle.import_bundle(archive)
+
+    assert (imported, skipped) == (["0.54.0", "0.55.1"], [])
+    path = resolve.get_version_path("0.55.1")
+    assert path.read_bytes() == b"0.55.1" * 1000
+    assert path.stat().st_mode & 0o777 == 0o755
+    assert (
+        resolve.get_manifest().load()["0.55.1"].sha256
+        == hashlib.sha256(path.read_bytes()).hexdigest()
+    )
+
+    assert bundle.import_bundle(archive) == ([], ["0.54.0", "0.55.1"])
+
+
+def test_export_requires_installed(tmp_path, versions_dir):
+    with pytest.raises(bundle.BundleError):
+        bundle.export_bundle(tmp_path / "bundle.tar", ["0.55.1"])
+
+
+DIGEST = hashlib.sha256(b"x").hexdigest()
+
+
+def _tar(path, members):
+    with tarfile.open(path, "w") as tar:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def test_digest_mismatch_is_rejected(tmp_path, versions_dir):
+    archive = tmp_path / "bundle.tar"
+    manifest = f"0.55.1\t3\t{hashlib.sha256(b'abc').hexdigest()}\t0\t0\n"
+    _tar(archive, [("manifest", manifest.encode()), ("0.55.1/terragrunt", b"abd")])
+
+    with pytest.raises(bundle.BundleError, match="expected sha256"):
+        bundle.import_bundle(archive)
+    assert not resolve.get_version_path("0.55.1").exists()
+    assert resolve.installed_versions() == []
+
+
+@pytest.mark.parametrize(
+    "name,manifest",
+    [
+        ("../evil/terragrunt", f"0.55.1\t1\t{DIGEST}\t0\t0\n"),
+        ("0.55.1/other", f"0.55.1\t1\t{DIGEST}\t0\t0\n"),
+        ("0.55.1/terragrunt", ""),
+    ],
+)
+def test_unexpected_members_are_rejected(tmp_path, versions_dir, name, manifest):
+    archive = tmp_path / "bundle.tar"
+    _tar(archive, [("manifest", manifest.encode()), (name, b"x")])
+    with pytest.raises(bundle.BundleError):
+        bundle.import_bundle(archive)
+
+
+def test_invalid_manifest_version(tmp_path, versions_dir):
+    archive = tmp_path / "bundle.tar"
+    _tar(archive, [("manifest", b"../evil\t1\t\t0\t0\n")])
+    with pytest.raises(bundle.BundleError):
+        bundle.import_bundle(archive)
+
+
+@pytest.mark.parametrize("digest", ["", "abc", DIGEST.upper(), "z" * 64])
+def test_entries_without_valid_digest_are_rejected(tmp_path, versions_dir, digest):
+    archive = tmp_path / "bundle.tar"
+    manifest = f"0.55.1\t1\t{digest}\t0\t0\n"
+    _tar(archive, [("manifest", manifest.encode()), ("0.55.1/terragrunt", b"x")])
+
+    with pytest.raises(bundle.BundleError, match="Invalid sha256"):
+        bundle.import_bundle(archive)
+    assert not resolve.get_version_path("0.55.1").exists()
+
+
+def test_empty_installed_digest_is_not_a_match(tmp_path, versions_dir):
+    path = resolve.get_version_path("0.55.1")
+    path.parent.mkdir()
+    path.write_bytes(b"old")
+    resolve.get_manifest().add("0.55.1", "")
+    archive = tmp_path / "bundle.tar"
+    manifest = f"0.55.1\t1\t{DIGEST}\t0\t0\n"
+    _tar(archive, [("manifest", manifest.encode()), ("0.55.1/terragrunt", b"x")])
+
+    assert bundle.import_bundle(archive) == (["0.55.1"], [])
+    assert path.read_bytes() == b"x"
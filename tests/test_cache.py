@@ -0,0 +1,118 @@
+import threading
+import urllib.error
+
+import pytest
+
+from terragrunt_env import helper, remote
+from terragrunt_env.cache import MISSING, Cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return Cache(tmp_path / "cache.json", ttl=60)
+
+
+@pytest.fixture
+def resolution_cache(tmp_path, monkeypatch):
+    cache = Cache(tmp_path / "resolve.json", ttl=60)
+    monkeypatch.setattr(remote, "RESOLUTION_CACHE", cache)
+    return cache
+
+
+class _Response:
+    status = 302
+
+    def __init__(self, location):
+        self.headers = {"Location": location}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+def test_concurrent_writers(cache):
+    errors = []
+
+    def write(i):
+        try:
+            for _ in range(50):
+                cache.set(str(i), i)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_unwritable_cache_is_skipped(tmp_path):
+    (tmp_path / "cache").touch()
+    cache = Cache(tmp_path / "cache" / "cache.json", ttl=60)
+    cache.set("latest", "0.55.1")
+    assert cache.get("latest") is MISSING
+
+
+def test_missing_key(cache):
+    assert cache.get("latest") is MISSING
+
+
+def test_positive_and_negative_entries(cache):
+    cache.set("latest", "0.55.1")
+    cache.set("9.9.9", None)
+    assert cache.get("latest") == "0.55.1"
+    assert cache.get("9.9.9") is None
+
+
+def test_expired_entry(cache, mocker):
+    cache.set("latest", "0.55.1")
+    mocker.patch("time.time", return_value=10**10)
+    assert cache.get("latest") is MISSING
+    assert cache.get("latest", stale=True) == "0.55.1"
+
+
+def test_corrupted_file(cache):
+    cache.path.write_text("{not json")
+    assert cache.get("latest") is MISSING
+    cache.set("latest", "0.55.1")
+    assert cache.get("latest") == "0.55.1"
+
+
+def test_check_remote_version_uses_cache(resolution_cache, mocker):
+    request = mocker.patch.object(
+        remote.SESSION,
+        "request",
+        return_value=_Response(
+            "https://github.com/gruntwork-io/terragrunt/releases/tag/v0.55.1"
+        ),
+    )
+    assert helper.check_remote_version("latest") == "0.55.1"
+    assert helper.check_remote_version("latest") == "0.55.1"
+    assert helper.check_remote_version("0.55.1") == "0.55.1"
+    assert request.call_count == 1
+
+
+def test_check_remote_version_negative_cache(resolution_cache, mocker):
+    request = mocker.patch.object(
+        remote.SESSION,
+        "request",
+        side_effect=urllib.error.HTTPError("", 404, "Not Found", {}, None),
+    )
+    assert helper.check_remote_version("9.9.9") is None
+    assert helper.check_remote_version("9.9.9") is None
+    assert request.call_count == 1
+
+
+def test_check_remote_version_stale_on_network_error(resolution_cache, mocker):
+    resolution_cache.set("latest", "0.55.1")
+    mocker.patch("time.time", return_value=10**10)
+    mocker.patch.object(
+        remote.SESSION, "request", side_effect=urllib.error.URLError("offline")
+    )
+    assert helper.check_remote_version("latest") == "0.55.1"
+    with pytest.raises(urllib.error.URLError):
+        helper.check_remote_version("0.1.0")
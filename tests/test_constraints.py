@@ -0,0 +1,101 @@
+import sys
+
+import pytest
+from typer.testing import CliRunner
+
+from terragrunt_env import cmd, constraints, launcher, resolve
+
+VERSIONS = [
+    "0.48.0",
+    "0.48.7",
+    "0.50.0",
+    "0.50.2",
+    "0.54.9",
+    "0.55.0",
+    "0.55.3",
+    "0.56.0-beta1",
+    "1.0.0",
+    "not-a-version",
+]
+
+
+@pytest.mark.parametrize(
+    "spec,expected",
+    [
+        ("latest", "1.0.0"),
+        ("*", "1.0.0"),
+        ("~> 0.50", "0.55.3"),
+        ("~> 0.50.0", "0.50.2"),
+        ("~>0.48.1", "0.48.7"),
+        (">=0.48,<0.55", "0.54.9"),
+        (">= 0.48, < 0.55, != 0.54.9", "0.50.2"),
+        ("0.55.x", "0.55.3"),
+        ("0.55.*", "0.55.3"),
+        ("0.x", "0.55.3"),
+        ("=0.55", "0.55.0"),
+        ("== 0.48.7", "0.48.7"),
+        (">0.55.3", "1.0.0"),
+        ("<=0.50.0", "0.50.0"),
+        (">=0.56.0-beta1, <1", "0.56.0-beta1"),
+        ("0.57.x", None),
+        (">1.0.0", None),
+    ],
+)
+def test_resolve(spec, expected):
+    assert constraints.Constraint(spec).resolve(VERSIONS) == expected
+
+
+@pytest.mark.parametrize("spec", ["~> 1", "> 0.55.x", "0.a.x", "foo", ">= bar"])
+def test_invalid_constraint(spec):
+    with pytest.raises(constraints.InvalidConstraint):
+        constraints.Constraint(spec)
+
+
+def test_sorted_versions_reused():
+    versions = constraints.SortedVersions(VERSIONS)
+    assert len(versions) == 9
+    assert constraints.Constraint("0.48.x").resolve(versions) == "0.48.7"
+    assert constraints.Constraint("~> 0.54.0").resolve(versions) == "0.54.9"
+
+
+@pytest.mark.parametrize(
+    "spec,expected",
+    [("0.55.1", False), ("latest", False), ("~> 0.55", True), ("0.55.x", True)],
+)
+def test_is_constraint(spec, expected):
+    assert resolve.is_constraint(spec) is expected
+
+
+def test_version_file_constraint_resolves_installed(
+    tmp_path, versions_dir, monkeypatch
+):
+    for v in ["0.55.0", "0.55.3", "0.56.0"]:
+        path = resolve.get_version_path(v)
+        path.parent.mkdir(parents=True)
+        path.touch(mode=0o755)
+    (tmp_path / ".terragrunt-version").write_text("~> 0.55.0\n")
+    monkeypatch.chdir(tmp_path)
+
+    assert resolve.get_version() == "0.55.3"
+
+    (tmp_path / ".terragrunt-version").write_text("0.57.x\n")
+    assert resolve.get_version() == "0.57.x"
+
+
+def test_invalid_version_file_constraint(tmp_path, versions_dir, monkeypatch, capsys):
+    version_file = tmp_path / ".terragrunt-version"
+    version_file.write_text(">= 0.5x\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TGENV_DAEMON_SOCKET", "")
+    monkeypatch.setattr(sys, "argv", ["terragrunt", "plan"])
+
+    with pytest.raises(SystemExit) as e:
+        launcher.main()
+    assert e.value.code == 1
+    assert capsys.readouterr().err == (
+        f"Invalid version constraint in {version_file}: '>= 0.5x'\n"
+    )
+
+    result = CliRunner().invoke(cmd.app, ["which"])
+    assert result.exit_code == 1
+    assert result.output.startswith("Invalid version constraint in ")
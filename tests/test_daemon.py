@@ -0,0 +1,124 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from terragrunt_env import daemon, daemon_client, launcher, resolve, settings
+
+
+@pytest.fixture
+def versions_dir(versions_dir, tmp_path):
+    binary = versions_dir / "0.55.1" / resolve._BIN_FILE_NAME
+    binary.parent.mkdir(parents=True)
+    binary.touch(mode=0o755)
+    (tmp_path / "repo").mkdir()
+    (tmp_path / "repo" / ".terragrunt-version").write_text("0.55.1\n")
+    return versions_dir
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    path = str(tmp_path / "d.sock")
+    monkeypatch.setenv("TGENV_DAEMON_SOCKET", path)
+    server = daemon.Daemon(path)
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_default_socket_path_matches_settings(monkeypatch):
+    monkeypatch.delenv("TGENV_DAEMON_SOCKET", raising=False)
+    assert daemon_client.socket_path() == settings.TGENV_DAEMON_SOCKET
+
+
+def test_lookup(tmp_path, versions_dir, server):
+    v, path = daemon_client.lookup(str(tmp_path / "repo"))
+    assert v == "0.55.1"
+    assert path == str(versions_dir / "0.55.1" / resolve._BIN_FILE_NAME)
+
+
+def test_lookup_of_missing_version(tmp_path, versions_dir, server):
+    (tmp_path / "repo" / ".terragrunt-version").write_text("0.1.0\n")
+    assert daemon_client.lookup(str(tmp_path / "repo")) is None
+
+
+def test_lookup_without_daemon(tmp_path):
+    assert daemon_client.lookup(str(tmp_path), str(tmp_path / "none.sock")) is None
+    assert daemon_client.lookup(str(tmp_path), "") is None
+
+
+def test_second_daemon_refused(server):
+    with pytest.raises(daemon.DaemonRunning):
+        daemon.Daemon(server.path)
+
+
+def test_stale_socket_replaced(tmp_path):
+    path = tmp_path / "d.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(path))
+    daemon.Daemon(str(path)).server_close()
+    assert not path.exists()
+
+
+def test_foreign_socket_not_trusted(tmp_path, versions_dir, server, monkeypatch):
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(server.path).st_uid + 1)
+    assert daemon_client.lookup(str(tmp_path / "repo")) is None
+    with pytest.raises(daemon.SocketNotOwned):
+        daemon.Daemon(server.path)
+
+
+def test_regular_file_not_trusted(tmp_path):
+    path = tmp_path / "d.sock"
+    path.touch()
+    assert daemon_client.lookup(str(tmp_path), str(path)) is None
+    with pytest.raises(daemon.SocketNotOwned):
+        daemon.Daemon(str(path))
+    assert path.exists()
+
+
+def test_launcher_asks_daemon(tmp_path, versions_dir, server, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path / "repo")
+    monkeypatch.setattr(sys, "argv", ["terragrunt", "plan"])
+    execv = mocker.patch("os.execv")
+    get_version = mocker.spy(resolve, "get_version")
+
+    launcher.main()
+
+    binary = str(versions_dir / "0.55.1" / resolve._BIN_FILE_NAME)
+    execv.assert_called_once_with(binary, [binary, "plan"])
+    # Only the daemon's resolver resolved the version.
+    assert get_version.call_count == 1
+
+
+def test_resolver_keeps_answers_in_memory(tmp_path, versions_dir, mocker):
+    resolver = daemon.Resolver()
+    repo = tmp_path / "repo"
+    binary = versions_dir / "0.55.1" / resolve._BIN_FILE_NAME
+    assert resolver.lookup(repo) == ("0.55.1", binary)
+
+    get_version = mocker.spy(resolve, "get_version")
+    assert resolver.lookup(repo) == ("0.55.1", binary)
+    get_version.assert_not_called()
+
+    # Editing the version file, or installing, invalidates the answer.
+    (repo / ".terragrunt-version").write_text("0.56.0\n")
+    os.utime(repo / ".terragrunt-version", ns=(0, 0))
+    assert resolver.lookup(repo) is None
+    path = versions_dir / "0.56.0" / resolve._BIN_FILE_NAME
+    path.parent.mkdir()
+    path.touch(mode=0o755)
+    assert resolver.lookup(repo) == ("0.56.0", path)
+    assert get_version.call_count == 2
+
+
+def test_resolver_answers_expire(tmp_path, versions_dir, mocker):
+    resolver = daemon.Resolver()
+    resolver.lookup(tmp_path / "repo")
+    get_version = mocker.spy(resolve, "get_version")
+    mocker.patch("time.monotonic", return_value=time.monotonic() + 3600)
+    resolver.lookup(tmp_path / "repo")
+    get_version.assert_called_once()
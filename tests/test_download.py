@@ -0,0 +1,208 @@
+import hashlib
+import os
+import urllib.error
+
+import pytest
+
+from terragrunt_env import download, session
+
+DATA = os.urandom(3 * download.BUFFER_SIZE + 123)
+DIGEST = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(session, "BACKOFF_BASE", 0)
+
+
+def test_fetch(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    path = tmp_path / "terragrunt"
+    digest = download.fetch(url, path)
+    assert path.read_bytes() == DATA
+    assert digest == DIGEST
+    assert not download.part_path(path).exists()
+
+
+@pytest.mark.parametrize("segments", [1, 4])
+def test_fetch_sets_mode_before_rename(fake_github, tmp_path, mocker, segments):
+    url = fake_github.add_asset("/asset", DATA)
+    path = tmp_path / "terragrunt"
+    modes = []
+    rename = os.rename
+    mocker.patch(
+        "os.replace",
+        side_effect=lambda src, dst: (
+            modes.append(os.stat(src).st_mode & 0o777),
+            rename(src, dst),
+        ),
+    )
+
+    download.fetch(url, path, segments=segments, mode=0o755)
+
+    assert modes == [0o755]
+    assert path.stat().st_mode & 0o777 == 0o755
+
+
+def test_fetch_resumes_after_drop(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    fake_github.drop_after = len(DATA) // 2
+    fake_github.drops = 1
+
+    path = tmp_path / "terragrunt"
+    digest = download.fetch(url, path)
+
+    assert path.read_bytes() == DATA
+    assert digest == DIGEST
+    assert fake_github.requests[1]["Range"] == f"bytes={len(DATA) // 2}-"
+
+
+def test_fetch_resumes_existing_part(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    path = tmp_path / "terragrunt"
+    download.part_path(path).write_bytes(DATA[:1000])
+
+    download.fetch(url, path)
+
+    assert path.read_bytes() == DATA
+    assert fake_github.requests[0]["Range"] == "bytes=1000-"
+
+
+def test_fetch_restarts_without_range_support(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    fake_github.accept_ranges = False
+    path = tmp_path / "terragrunt"
+    download.part_path(path).write_bytes(b"garbage")
+
+    download.fetch(url, path)
+
+    assert path.read_bytes() == DATA
+
+
+def test_fetch_discards_oversized_part(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    path = tmp_path / "terragrunt"
+    download.part_path(path).write_bytes(DATA + b"garbage")
+
+    download.fetch(url, path)
+
+    assert path.read_bytes() == DATA
+
+
+def test_fetch_keeps_part_when_retries_exhausted(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    fake_github.drop_after = 1000
+    fake_github.drops = 10
+    path = tmp_path / "terragrunt"
+
+    with pytest.raises(download.DownloadError):
+        download.fetch(url, path, retries=2)
+
+    assert not path.exists()
+    assert download.part_path(path).stat().st_size == 3000
+
+
+def test_fetch_retries_transient_errors(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    fake_github.fail(503, path="/asset")
+    fake_github.retry_after = "0"
+    path = tmp_path / "terragrunt"
+
+    assert download.fetch(url, path, segments=1) == DIGEST
+
+    assert fake_github.errors == 1
+
+
+def test_fetch_does_not_wait_out_long_retry_after(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    fake_github.fail(429, path="/asset")
+    fake_github.retry_after = "3600"
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        download.fetch(url, tmp_path / "terragrunt", segments=1)
+
+    assert e.value.code == 429
+    assert len(fake_github.requests) == 1
+
+
+def test_fetch_not_found(fake_github, tmp_path):
+    with pytest.raises(urllib.error.HTTPError):
+        download.fetch(fake_github.url + "/missing", tmp_path / "terragrunt")
+    assert fake_github.requests[0]["path"] == "/missing"
+    assert len(fake_github.requests) == 1
+
+
+@pytest.mark.parametrize("size,segments", [(10, 3), (9, 3), (1, 4), (100, 1)])
+def test_split_ranges(size, segments):
+    ranges = download.split_ranges(size, segments)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == size - 1
+    assert all(a[1] + 1 == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_fetch_segmented(fake_github, tmp_path, monkeypatch):
+    monkeypatch.setattr(download, "MIN_SEGMENT_SIZE", 1024)
+    url = fake_github.add_asset("/asset", DATA)
+
+    path = tmp_path / "terragrunt"
+    digest = download.fetch(url, path, segments=4)
+
+    assert path.read_bytes() == DATA
+    assert digest == DIGEST
+    ranges = sorted(r["Range"] for r in fake_github.requests if "Range" in r)
+    assert len(ranges) == 4
+    assert fake_github.requests[0]["method"] == "HEAD"
+
+
+def test_fetch_segmented_resumes_segment(fake_github, tmp_path, monkeypatch):
+    monkeypatch.setattr(download, "MIN_SEGMENT_SIZE", 1024)
+    url = fake_github.add_asset("/asset", DATA)
+    fake_github.drop_after = 1000
+    fake_github.drops = 2
+
+    path = tmp_path / "terragrunt"
+    digest = download.fetch(url, path, segments=4)
+
+    assert path.read_bytes() == DATA
+    assert digest == DIGEST
+    assert not path.with_name("terragrunt.segments").exists()
+
+
+def test_fetch_segmented_falls_back_without_ranges(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    fake_github.accept_ranges = False
+
+    path = tmp_path / "terragrunt"
+    digest = download.fetch(url, path, segments=4)
+
+    assert path.read_bytes() == DATA
+    assert digest == DIGEST
+    assert [r["method"] for r in fake_github.requests] == ["HEAD", "GET"]
+
+
+def test_fetch_resumed_digest_covers_existing_part(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    path = tmp_path / "terragrunt"
+    download.part_path(path).write_bytes(DATA[:1000])
+
+    assert download.fetch(url, path, sha256=DIGEST) == DIGEST
+
+
+def test_fetch_checksum_mismatch(fake_github, tmp_path):
+    url = fake_github.add_asset("/asset", DATA)
+    path = tmp_path / "terragrunt"
+
+    with pytest.raises(download.ChecksumMismatch):
+        download.fetch(url, path, sha256="0" * 64)
+
+    assert not path.exists()
+    assert not download.part_path(path).exists()
+
+
+def test_fetch_segmented_checksum(fake_github, tmp_path, monkeypatch):
+    monkeypatch.setattr(download, "MIN_SEGMENT_SIZE", 1024)
+    url = fake_github.add_asset("/asset", DATA)
+
+    with pytest.raises(download.ChecksumMismatch):
+        download.fetch(url, tmp_path / "terragrunt", segments=4, sha256="0" * 64)
+    assert list(tmp_path.iterdir()) == []
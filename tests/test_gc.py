@@ -0,0 +1,73 @@
+import pytest
+from typer.testing import CliRunner
+
+from terragrunt_env import cmd, helper, resolve
+
+
+@pytest.fixture
+def store(tmp_path, versions_dir, monkeypatch, mocker):
+    monkeypatch.setattr(helper, "TGENV_ROOT", tmp_path)
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    (tmp_path / "work").mkdir()
+    monkeypatch.chdir(tmp_path / "work")
+
+    manifest = resolve.get_manifest()
+    clock = mocker.patch("time.time")
+    for i, v in enumerate(["0.50.0", "0.51.0", "0.52.0", "0.53.0", "0.54.0"]):
+        path = resolve.get_version_path(v)
+        path.parent.mkdir()
+        path.write_bytes(b"x" * 100)
+        path.chmod(0o755)
+        clock.return_value = 1000.0 + i
+        manifest.add(v)
+    # 0.50.0 was installed first but used most recently.
+    clock.return_value = 2000000.0
+    manifest.touch("0.50.0")
+    return tmp_path
+
+
+def test_evicts_least_recently_used_by_count(store):
+    evicted = helper.collect_garbage(max_count=3)
+    assert [e.version for e in evicted] == ["0.51.0", "0.52.0"]
+    assert sorted(resolve.installed_versions()) == ["0.50.0", "0.53.0", "0.54.0"]
+    assert not resolve.get_version_path("0.51.0").parent.exists()
+
+
+def test_evicts_by_bytes(store):
+    evicted = helper.collect_garbage(max_bytes=250)
+    assert [e.version for e in evicted] == ["0.51.0", "0.52.0", "0.53.0"]
+
+
+def test_dry_run_keeps_everything(store):
+    evicted = helper.collect_garbage(max_count=1, dry_run=True)
+    assert len(evicted) == 4
+    assert len(resolve.installed_versions()) == 5
+
+
+def test_pinned_versions_are_protected(store):
+    (store / "work" / ".terragrunt-version").write_text("0.51.0\n")
+    (store / "home").mkdir()
+    (store / "home" / ".terragrunt-version").write_text("~> 0.52.0\n")
+    (store / "version").write_text("0.53.0\n")
+
+    evicted = helper.collect_garbage(max_count=1, keep=["0.54.0"])
+    assert [e.version for e in evicted] == ["0.50.0"]
+    assert sorted(resolve.installed_versions()) == [
+        "0.51.0",
+        "0.52.0",
+        "0.53.0",
+        "0.54.0",
+    ]
+
+
+def test_auto_mode_is_off_by_default(store):
+    assert helper.auto_collect_garbage() == []
+
+
+def test_which_touch_marks_version_used(store):
+    result = CliRunner().invoke(cmd.app, ["which", "--touch", "0.51.0"])
+
+    assert result.exit_code == 0
+    assert resolve.get_manifest().load()["0.51.0"].last_used == 2000000.0
+    evicted = helper.collect_garbage(max_count=3)
+    assert [e.version for e in evicted] == ["0.52.0", "0.53.0"]
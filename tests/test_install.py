@@ -0,0 +1,134 @@
+import hashlib
+
+import pytest
+from typer.testing import CliRunner
+
+from terragrunt_env import cmd, helper, remote, resolve, session
+from terragrunt_env.cache import Cache
+
+runner = CliRunner()
+ASSET = "/gruntwork-io/terragrunt/releases/download/v{}/terragrunt_linux_amd64"
+
+
+@pytest.fixture
+def github(fake_github, tmp_path, versions_dir, monkeypatch):
+    source = remote.GitHubSource(fake_github.repo_url, fake_github.api_url)
+    monkeypatch.setattr(remote, "SOURCE", source)
+    monkeypatch.setattr(remote, "RESOLUTION_CACHE", Cache(tmp_path / "r.json", 60))
+    monkeypatch.setattr(remote, "TAG_INDEX", Cache(tmp_path / "tags.json", 60))
+    monkeypatch.setattr(helper, "TGENV_ROOT", tmp_path)
+    monkeypatch.setattr(helper, "_OS", "linux")
+    monkeypatch.setattr(helper, "detect_arch", lambda: "amd64")
+    monkeypatch.setattr(session, "BACKOFF_BASE", 0)
+    limits = remote.RateLimits(Cache(tmp_path / "ratelimit.json", 0))
+    monkeypatch.setattr(remote, "RATE_LIMITS", limits)
+    for v in ["0.54.0", "0.55.0", "0.55.1"]:
+        fake_github.publish(v, v.encode() * 1000)
+    return fake_github
+
+
+def install(version):
+    return runner.invoke(cmd.app, ["install", version])
+
+
+def test_install_latest(github, tmp_path):
+    result = install("latest")
+
+    assert result.exit_code == 0, result.output
+    assert "Installation of Terragrunt version 0.55.1 successful." in result.output
+    path = resolve.get_version_path("0.55.1")
+    assert path.read_bytes() == b"0.55.1" * 1000
+    assert resolve.get_manifest().load()["0.55.1"].sha256 == (
+        hashlib.sha256(path.read_bytes()).hexdigest()
+    )
+    assert (tmp_path / "version").read_text() == "0.55.1\n"
+
+    assert install("0.55.1").output == "Terragrunt version 0.55.1 already installed.\n"
+
+
+def test_install_constraint_and_list_remote(github):
+    assert install("~> 0.54.0").exit_code == 0
+    assert resolve.installed_versions() == ["0.54.0"]
+
+    result = runner.invoke(cmd.app, ["list-remote"])
+    assert result.output.split() == ["0.55.1", "0.55.0", "0.54.0"]
+
+
+def test_unknown_version(github):
+    result = install("0.99.0")
+    assert result.exit_code == 1
+    assert result.output == "There is no version 0.99.0\n"
+
+
+def test_checksum_mismatch(github):
+    github.publish("0.56.0", b"good")
+    github.assets[ASSET.format("0.56.0")] = b"evil"
+
+    result = install("0.56.0")
+
+    assert result.exit_code == 1
+    assert "Checksum verification of Terragrunt version='0.56.0' failed" in (
+        result.output
+    )
+    assert not resolve.is_version_installed("0.56.0")
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503])
+def test_asset_errors_are_retried(github, status):
+    github.retry_after = "0"
+    github.fail(status, count=2, path=ASSET.format("0.55.0"))
+
+    assert install("0.55.0").exit_code == 0
+    assert resolve.get_version_path("0.55.0").read_bytes() == b"0.55.0" * 1000
+    assert github.errors == 2
+
+
+def test_dropped_download_is_resumed(github):
+    github.drop_after = 1000
+    github.drops = 2
+
+    assert install("0.55.1").exit_code == 0
+    assert resolve.get_version_path("0.55.1").read_bytes() == b"0.55.1" * 1000
+    ranges = [r.get("Range") for r in github.requests if r["path"].endswith("amd64")]
+    assert ranges == [None, "bytes=1000-", "bytes=2000-"]
+
+
+def test_persistent_errors_fail_the_install(github):
+    github.fail(503, count=100, path=ASSET.format("0.55.1"))
+
+    result = install("0.55.1")
+
+    assert result.exit_code == 1
+    assert "Download of Terragrunt version='0.55.1' failed" in result.output
+    assert not resolve.is_version_installed("0.55.1")
+
+
+def test_unreachable_release_page(github):
+    github.fail(503, count=100, path="/gruntwork-io/terragrunt/releases/tag/")
+
+    result = install("0.55.1")
+
+    assert result.exit_code == 1
+    assert result.output == (
+        "Looking up Terragrunt version 0.55.1 failed: Service Unavailable\n"
+    )
+
+
+def test_unreachable_download_host(github, monkeypatch):
+    source = remote.GitHubSource("http://127.0.0.1:1/x", github.api_url)
+    monkeypatch.setattr(remote, "SOURCE", source)
+    # Resolved while the host was still up.
+    remote.RESOLUTION_CACHE.set("0.55.0", "0.55.0")
+
+    result = install("0.55.0")
+
+    assert result.exit_code == 1
+    assert "Download of Terragrunt version='0.55.0' failed: " in result.output
+    assert not resolve.is_version_installed("0.55.0")
+
+
+def test_arch_override(monkeypatch, mocker):
+    mocker.patch("platform.machine", return_value="x86_64")
+    assert helper.detect_arch() == "amd64"
+    monkeypatch.setattr(helper, "TGENV_ARCH", "arm64")
+    assert helper.detect_arch() == "arm64"
@@ -0,0 +1,90 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from terragrunt_env import launcher, resolve
+
+
+@pytest.fixture
+def versions_dir(versions_dir, monkeypatch):
+    monkeypatch.setenv("TGENV_DAEMON_SOCKET", "")
+    return versions_dir
+
+
+def _startup_time(module: str, runs: int = 5) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_launcher_imports_only_stdlib():
+    code = "import sys, terragrunt_env.launcher; print('typer' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_resolution_does_not_import_typing():
+    code = (
+        "import sys, terragrunt_env.launcher, terragrunt_env.resolve; "
+        "print('typing' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_launcher_startup_is_faster_than_cmd():
+    assert _startup_time("terragrunt_env.launcher") < _startup_time(
+        "terragrunt_env.cmd"
+    )
+
+
+def test_main_execs_pinned_version(tmp_path, versions_dir, monkeypatch, mocker):
+    binary = versions_dir / "0.55.1" / resolve._BIN_FILE_NAME
+    binary.parent.mkdir(parents=True)
+    binary.touch(mode=0o755)
+    (tmp_path / ".terragrunt-version").write_text("0.55.1\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["terragrunt", "plan", "--all"])
+    execv = mocker.patch("os.execv")
+
+    launcher.main()
+
+    execv.assert_called_once_with(str(binary), [str(binary), "plan", "--all"])
+
+
+def test_main_missing_version(tmp_path, versions_dir, monkeypatch, capsys):
+    (tmp_path / ".terragrunt-version").write_text("0.55.1\n")
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as e:
+        launcher.main()
+
+    assert e.value.code == 1
+    assert "tgenv install 0.55.1" in capsys.readouterr().err
+
+
+def test_main_binary_that_cannot_run(tmp_path, versions_dir, monkeypatch, capsys):
+    binary = versions_dir / "0.55.1" / resolve._BIN_FILE_NAME
+    binary.parent.mkdir(parents=True)
+    binary.write_bytes(b"\x7fELF garbage")
+    binary.chmod(0o755)
+    (tmp_path / ".terragrunt-version").write_text("0.55.1\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["terragrunt"])
+
+    with pytest.raises(SystemExit) as e:
+        launcher.main()
+
+    assert e.value.code == 1
+    err = capsys.readouterr().err
+    assert err.startswith("Cannot run Terragrunt version 0.55.1: Exec format error")
+    assert "tgenv uninstall 0.55.1 && tgenv install 0.55.1" in err
@@ -0,0 +1,160 @@
+import fcntl
+import hashlib
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+import typer
+
+from terragrunt_env import helper, lock, resolve
+from terragrunt_env.lock import FileLock, LockTimeout
+
+HOLDER = """
+import sys, time
+from terragrunt_env.lock import FileLock
+with FileLock(__import__("pathlib").Path(sys.argv[1])):
+    print("locked", flush=True)
+    time.sleep(float(sys.argv[2]))
+"""
+
+
+def _hold(path, seconds):
+    process = subprocess.Popen(
+        [sys.executable, "-c", HOLDER, str(path), str(seconds)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert process.stdout.readline() == "locked\n"
+    return process
+
+
+def test_lock_records_owner(tmp_path):
+    path = tmp_path / "locks" / "x.lock"
+    with FileLock(path):
+        assert path.read_text() == f"{os.getpid()} {socket.gethostname()}\n"
+    assert not path.exists()
+
+
+def test_lock_times_out_while_held(tmp_path):
+    path = tmp_path / "x.lock"
+    with FileLock(path):
+        with pytest.raises(LockTimeout):
+            FileLock(path, timeout=0.1).acquire()
+
+
+def test_waits_for_other_process(tmp_path):
+    path = tmp_path / "x.lock"
+    holder = _hold(path, 0.3)
+    start = time.monotonic()
+    with FileLock(path, timeout=5):
+        assert time.monotonic() - start >= 0.2
+    holder.wait()
+
+
+def test_breaks_lock_of_killed_process(tmp_path):
+    path = tmp_path / "x.lock"
+    holder = _hold(path, 60)
+    holder.kill()
+    holder.wait()
+    assert path.exists()
+    start = time.monotonic()
+    with FileLock(path, timeout=5):
+        assert time.monotonic() - start < 1
+
+
+def test_leftover_file_is_not_a_lock(tmp_path):
+    path = tmp_path / "x.lock"
+    path.write_text("1 some-other-host\n")
+    with FileLock(path, timeout=0):
+        assert path.read_text().startswith(f"{os.getpid()} ")
+
+
+def test_waiter_on_released_inode_retries(tmp_path):
+    path = tmp_path / "x.lock"
+    first = FileLock(path)
+    first.acquire()
+    stale_fd = os.open(path, os.O_RDWR)
+    first.release()
+    with FileLock(path, timeout=0):
+        # The old inode is unlocked but no longer the lock file.
+        fcntl.flock(stale_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert not lock._same_file(stale_fd, path)
+        with pytest.raises(LockTimeout):
+            FileLock(path, timeout=0.05).acquire()
+    os.close(stale_fd)
+
+
+def test_exclusive_fallback_goes_stale_by_age(tmp_path, monkeypatch):
+    monkeypatch.setattr(lock, "fcntl", None)
+    path = tmp_path / "x.lock"
+    path.write_text("1 some-other-host\n")
+    with pytest.raises(LockTimeout):
+        FileLock(path, timeout=0.1, stale_after=60).acquire()
+
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    with FileLock(path, timeout=0.1, stale_after=60):
+        assert path.read_text().startswith(f"{os.getpid()} ")
+    assert not path.exists()
+
+
+def test_concurrent_installs_download_once(versions_dir, monkeypatch):
+    downloads = []
+
+    def download_version(version):
+        downloads.append(version)
+        time.sleep(0.2)
+        path = resolve.get_version_path(version)
+        path.write_bytes(b"terragrunt")
+        helper.save_digest(path, hashlib.sha256(b"terragrunt").hexdigest())
+        return path
+
+    monkeypatch.setattr(helper, "download_version", download_version)
+    threads = [
+        threading.Thread(target=helper.install_version, args=("0.55.1",))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert downloads == ["0.55.1"]
+    assert resolve.installed_versions() == ["0.55.1"]
+    assert not resolve.get_lock_path("0.55.1").exists()
+
+
+def test_concurrent_manifest_adds_are_kept(versions_dir):
+    versions = [f"0.{minor}.0" for minor in range(8)]
+    for v in versions:
+        path = resolve.get_version_path(v)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"terragrunt")
+    resolve.get_manifest().rebuild()
+    for v in versions:
+        resolve.get_manifest().remove(v)
+
+    threads = [
+        threading.Thread(target=resolve.get_manifest().add, args=(v,)) for v in versions
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(resolve.get_manifest().load()) == sorted(versions)
+
+
+def test_install_without_digest_fails(versions_dir, monkeypatch):
+    def download_version(version):
+        path = resolve.get_version_path(version)
+        path.write_bytes(b"terragrunt")
+        return path
+
+    monkeypatch.setattr(helper, "download_version", download_version)
+    with pytest.raises(typer.Exit):
+        helper.install_version("0.55.1")
+    assert resolve.installed_versions() == []
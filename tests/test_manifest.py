@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from terragrunt_env import launcher, manifest, resolve
+
+
+def _install(versions_dir, version, data=b"binary"):
+    path = versions_dir / version / resolve._BIN_FILE_NAME
+    path.parent.mkdir()
+    path.write_bytes(data)
+    path.chmod(0o755)
+    path.with_name(f"{path.name}.sha256").write_text(f"abc123  {path.name}\n")
+    return path
+
+
+def test_rebuilt_from_scan(versions_dir):
+    _install(versions_dir, "0.55.1")
+    (versions_dir / "0.54.0").mkdir()
+
+    entries = resolve.get_manifest().load()
+    assert list(entries) == ["0.55.1"]
+    assert entries["0.55.1"].size == 6
+    assert entries["0.55.1"].sha256 == "abc123"
+    assert versions_dir.with_name("versions.manifest").exists()
+
+
+def test_partial_install_is_not_listed(versions_dir):
+    _install(versions_dir, "0.55.1")
+    _install(versions_dir, "0.55.2").chmod(0o644)
+
+    assert list(resolve.get_manifest().load()) == ["0.55.1"]
+    assert not resolve.is_version_installed("0.55.2")
+
+
+def test_read_without_scanning(versions_dir, mocker):
+    _install(versions_dir, "0.55.1")
+    resolve.get_manifest().load()
+
+    scan = mocker.patch.object(manifest.Manifest, "rebuild")
+    assert resolve.installed_versions() == ["0.55.1"]
+    assert resolve.is_version_installed("0.55.1")
+    assert not resolve.is_version_installed("0.54.0")
+    scan.assert_not_called()
+
+
+def test_directory_change_triggers_rebuild(versions_dir):
+    _install(versions_dir, "0.55.1")
+    assert resolve.installed_versions() == ["0.55.1"]
+
+    _install(versions_dir, "0.56.0")
+    os.utime(versions_dir, ns=(0, 0))
+    assert sorted(resolve.installed_versions()) == ["0.55.1", "0.56.0"]
+
+
+def test_add_remove_and_touch(versions_dir, mocker):
+    m = resolve.get_manifest()
+    _install(versions_dir, "0.55.1")
+    entry = m.add("0.55.1", "def456")
+    installed_at = entry.installed_at
+    assert entry.last_used == installed_at
+
+    mocker.patch("time.time", return_value=installed_at + 60)
+    m.touch("0.55.1")
+    assert resolve.get_manifest().load()["0.55.1"].last_used == installed_at
+
+    mocker.patch("time.time", return_value=installed_at + 7200)
+    m.touch("0.55.1")
+    loaded = resolve.get_manifest().load()["0.55.1"]
+    assert loaded.last_used == installed_at + 7200
+    assert loaded.sha256 == "def456"
+
+    m.remove("0.55.1")
+    assert resolve.get_manifest().load() == {}
+
+
+def test_launcher_drops_deleted_binary(tmp_path, versions_dir, monkeypatch, mocker):
+    monkeypatch.setenv("TGENV_DAEMON_SOCKET", "")
+    binary = _install(versions_dir, "0.55.1")
+    resolve.get_manifest().load()
+    binary.unlink()
+    (tmp_path / ".terragrunt-version").write_text("0.55.1\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(resolve, "VERSION_FILE_MEMO_DIR", tmp_path / "memo")
+    mocker.patch("os.execv", side_effect=FileNotFoundError)
+
+    with pytest.raises(SystemExit):
+        launcher.main()
+    assert resolve.get_manifest().load() == {}
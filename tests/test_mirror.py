@@ -0,0 +1,137 @@
+import hashlib
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from terragrunt_env import cmd, download, mirror, remote
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    root = tmp_path / "upstream"
+    for v in ["0.54.0", "0.55.0", "0.55.1", "0.56.0-beta1"]:
+        path = mirror.asset_path(root, v, remote.asset_name("linux", "amd64"))
+        path.parent.mkdir(parents=True)
+        path.write_bytes(v.encode())
+    mirror.update_index(root, ["0.54.0", "0.55.0", "0.55.1", "0.56.0-beta1"])
+    mirror.save_checksums(
+        mirror.asset_path(root, "0.54.0", remote.CHECKSUMS_FILE_NAME),
+        {"terragrunt_linux_amd64": hashlib.sha256(b"0.54.0").hexdigest()},
+    )
+    return root
+
+
+def test_get_source():
+    assert type(remote.get_source("")) is remote.GitHubSource
+    source = remote.get_source("https://mirror.local/terragrunt/")
+    assert isinstance(source, remote.MirrorSource)
+    assert (
+        source.asset_url("0.55.1", "terragrunt_linux_amd64")
+        == "https://mirror.local/terragrunt/releases/download/v0.55.1/terragrunt_linux_amd64"
+    )
+
+
+def test_get_source_local_directory(tmp_path):
+    assert remote.get_source(str(tmp_path)).url == tmp_path.as_uri()
+
+
+def test_update_index_sorts_versions(tmp_path):
+    mirror.update_index(tmp_path, ["0.9.0", "0.10.0"])
+    assert mirror.update_index(tmp_path, ["0.10.1"]) == ["0.10.1", "0.10.0", "0.9.0"]
+
+
+def test_local_mirror_resolution(upstream):
+    source = remote.get_source(str(upstream))
+    assert source.resolve("latest") == "0.55.1"
+    assert source.resolve("0.54.0") == "0.54.0"
+    assert source.resolve("0.1.0") is None
+    assert source.list_versions(2) == ["0.56.0-beta1", "0.55.1"]
+
+
+def test_empty_local_mirror(tmp_path):
+    source = remote.get_source(str(tmp_path))
+    assert source.resolve("latest") is None
+    assert source.list_versions() == []
+
+
+def test_local_mirror_download(upstream, tmp_path):
+    source = remote.get_source(str(upstream))
+    url = source.asset_url("0.55.1", "terragrunt_linux_amd64")
+    path = tmp_path / "terragrunt"
+    digest = download.fetch(url, path)
+    assert path.read_bytes() == b"0.55.1"
+    assert digest == hashlib.sha256(b"0.55.1").hexdigest()
+
+
+def test_sync(upstream, tmp_path):
+    root = tmp_path / "mirror"
+    synced, missing, failed = mirror.sync(
+        root,
+        ["latest", "0.54.0", "0.1.0"],
+        [("linux", "amd64")],
+        source=remote.get_source(str(upstream)),
+    )
+    assert synced == ["0.55.1", "0.54.0"]
+    assert missing == ["0.1.0"]
+    assert failed == {}
+    assert json.loads((root / "index.json").read_text()) == {
+        "versions": ["0.55.1", "0.54.0"]
+    }
+    path = mirror.asset_path(root, "0.54.0", "terragrunt_linux_amd64")
+    assert path.read_bytes() == b"0.54.0"
+    assert remote.get_source(str(root)).checksums("0.54.0") == {
+        "terragrunt_linux_amd64": hashlib.sha256(b"0.54.0").hexdigest()
+    }
+    assert remote.get_source(str(root)).checksums("0.55.1") == {}
+
+
+def test_http_mirror(fake_github, upstream, tmp_path):
+    for path in upstream.rglob("*"):
+        if path.is_file():
+            fake_github.add_asset(f"/{path.relative_to(upstream)}", path.read_bytes())
+    source = remote.get_source(fake_github.url)
+
+    assert source.resolve("latest") == "0.55.1"
+    url = source.asset_url("0.55.0", "terragrunt_linux_amd64")
+    download.fetch(url, tmp_path / "terragrunt")
+    assert (tmp_path / "terragrunt").read_bytes() == b"0.55.0"
+
+
+def test_sync_checksum_mismatch(upstream, tmp_path):
+    mirror.save_checksums(
+        mirror.asset_path(upstream, "0.55.1", remote.CHECKSUMS_FILE_NAME),
+        {"terragrunt_linux_amd64": "0" * 64},
+    )
+    synced, missing, failed = mirror.sync(
+        tmp_path / "mirror",
+        ["0.55.1", "0.55.0"],
+        [("linux", "amd64")],
+        source=remote.get_source(str(upstream)),
+    )
+    assert (synced, missing) == (["0.55.0"], [])
+    assert "expected sha256 0000" in failed["0.55.1"]
+    assert mirror.update_index(tmp_path / "mirror", []) == ["0.55.0"]
+
+
+def test_sync_missing_platform(upstream, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        mirror, "GitHubSource", lambda: remote.get_source(str(upstream))
+    )
+    result = runner.invoke(
+        cmd.app,
+        ["mirror", "sync", str(tmp_path / "mirror"), "0.55.1", "--arch", "arm64"],
+    )
+    assert result.exit_code == 1
+    assert result.output.startswith("Mirroring Terragrunt version 0.55.1 failed: ")
+    assert "HTTP Error 404" in result.output
+
+
+def test_parse_checksums():
+    text = "ABC  terragrunt_linux_amd64\ndef *terragrunt_windows_amd64.exe\n\n"
+    assert remote.parse_checksums(text) == {
+        "terragrunt_linux_amd64": "abc",
+        "terragrunt_windows_amd64.exe": "def",
+    }
@@ -0,0 +1,50 @@
+import pytest
+import typer
+
+from terragrunt_env import helper, remote, resolve
+from terragrunt_env.cache import Cache
+
+
+@pytest.fixture
+def offline(tmp_path, versions_dir, monkeypatch, mocker):
+    monkeypatch.setattr(remote, "OFFLINE", True)
+    monkeypatch.setattr(remote, "TAG_INDEX", Cache(tmp_path / "tags.json", ttl=60))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    mocker.patch.object(resolve, "TGENV_ROOT", tmp_path)
+    return mocker.patch.object(
+        remote.SESSION, "request", side_effect=AssertionError("network used")
+    )
+
+
+def _install(*versions):
+    for v in versions:
+        path = resolve.get_version_path(v)
+        path.parent.mkdir(parents=True)
+        path.touch(mode=0o755)
+
+
+def test_latest_is_highest_installed_release(offline):
+    _install("0.54.0", "0.55.1", "0.56.0-beta1")
+    remote.TAG_INDEX.set("tags", {"etag": None, "tags": ["v0.57.0", "v0.55.1"]})
+
+    assert resolve.get_version() == "0.55.1"
+    assert helper.check_remote_version("0.54.0") == "0.54.0"
+
+
+def test_cached_index_when_nothing_installed(offline):
+    remote.TAG_INDEX.set("tags", {"etag": None, "tags": ["v0.57.0", "v0.55.1"]})
+    assert helper.check_remote_version("latest") == "0.57.0"
+    assert helper.resolve_remote_version("~> 0.55.0") == "0.55.1"
+    assert helper.get_remote_versions(limit=1, refresh=True) == ["0.57.0"]
+
+
+def test_unknown_version(offline):
+    _install("0.55.1")
+    assert helper.check_remote_version("9.9.9") is None
+
+
+def test_download_refused(offline):
+    with pytest.raises(typer.Exit):
+        helper.download_version("0.55.1")
+    assert not offline.called
@@ -0,0 +1,78 @@
+import pytest
+
+from terragrunt_env import helper, mirror, remote, resolve, session
+from terragrunt_env.cache import Cache
+
+
+@pytest.fixture
+def upstream(tmp_path, versions_dir, monkeypatch):
+    root = tmp_path / "upstream"
+    for v in ["0.54.0", "0.55.0", "0.55.1"]:
+        path = mirror.asset_path(root, v, remote.asset_name("linux", "amd64"))
+        path.parent.mkdir(parents=True)
+        path.write_bytes(v.encode())
+    mirror.update_index(root, ["0.54.0", "0.55.0", "0.55.1"])
+
+    source = remote.get_source(str(root))
+    monkeypatch.setattr(remote, "SOURCE", source)
+    monkeypatch.setattr(remote, "RESOLUTION_CACHE", Cache(tmp_path / "r.json", 60))
+    monkeypatch.setattr(helper, "_OS", "linux")
+    monkeypatch.setattr(helper, "detect_arch", lambda: "amd64")
+    return root
+
+
+@pytest.fixture
+def tree(tmp_path):
+    pins = {
+        "a": "0.55.1",
+        "a/b": "0.55.1",
+        "c": "~> 0.55.0",
+        "d/e/f": "0.54.0",
+        "g": "9.9.9",
+        "h/.terragrunt-cache/x": "0.55.0",
+    }
+    for directory, pin in pins.items():
+        path = tmp_path / "repo" / directory / resolve.VERSION_FILE_NAME
+        path.parent.mkdir(parents=True)
+        path.write_text(pin + "\n")
+    return tmp_path / "repo"
+
+
+def test_find_pinned_versions(tree):
+    assert helper.find_pinned_versions(tree) == {
+        "0.55.1",
+        "~> 0.55.0",
+        "0.54.0",
+        "9.9.9",
+    }
+
+
+def test_prefetch_installs_distinct_versions(upstream, tree):
+    installed, present, failed = helper.prefetch(helper.find_pinned_versions(tree))
+
+    assert installed == ["0.54.0", "0.55.1"]
+    assert present == []
+    assert failed == ["9.9.9"]
+    assert sorted(resolve.installed_versions()) == ["0.54.0", "0.55.1"]
+    assert resolve.get_version_path("0.55.1").read_bytes() == b"0.55.1"
+
+
+def test_prefetch_skips_installed(upstream, tree):
+    helper.install_version("0.54.0")
+    installed, present, failed = helper.prefetch({"0.54.0", "0.55.x"}, jobs=2)
+    assert (installed, present, failed) == (["0.55.1"], ["0.54.0"], [])
+
+
+def test_prefetch_reports_failed_lookups(upstream, monkeypatch, capsys):
+    assert helper.prefetch({">= 0.5x"}) == ([], [], [">= 0.5x"])
+    assert "Invalid constraint: '>= 0.5x'" in capsys.readouterr().out
+
+    monkeypatch.setattr(session, "BACKOFF_BASE", 0)
+    monkeypatch.setattr(remote, "SOURCE", remote.get_source("http://127.0.0.1:1"))
+
+    installed, present, failed = helper.prefetch({"0.55.1", "0.54.x"})
+
+    assert (installed, present, failed) == ([], [], ["0.54.x", "0.55.1"])
+    out = capsys.readouterr().out
+    assert "Looking up Terragrunt version 0.55.1 failed: " in out
+    assert "Looking up Terragrunt version 0.54.x failed: " in out
@@ -0,0 +1,150 @@
+import time
+import urllib.error
+
+import pytest
+
+from terragrunt_env import remote, session
+from terragrunt_env.cache import Cache
+
+
+@pytest.fixture(autouse=True)
+def rate_limits(tmp_path, monkeypatch):
+    monkeypatch.setattr(session, "BACKOFF_BASE", 0)
+    monkeypatch.setattr(remote, "RESOLUTION_CACHE", Cache(tmp_path / "r.json", 60))
+    limits = remote.RateLimits(Cache(tmp_path / "ratelimit.json", 0))
+    monkeypatch.setattr(remote, "RATE_LIMITS", limits)
+    return limits
+
+
+@pytest.fixture
+def tag_index(tmp_path, monkeypatch):
+    cache = Cache(tmp_path / "tags.json", ttl=60)
+    monkeypatch.setattr(remote, "TAG_INDEX", cache)
+    monkeypatch.setattr(remote, "TAGS_PER_PAGE", 2)
+    return cache
+
+
+@pytest.fixture
+def source(fake_github):
+    fake_github.tags = ["v0.55.1", "v0.55.0", "v0.54.0", "v0.9.0", "not-a-version"]
+    return remote.GitHubSource(fake_github.repo_url, fake_github.api_url)
+
+
+def _tag_requests(fake_github):
+    return [r for r in fake_github.requests if r["path"].startswith("/repos/")]
+
+
+def test_full_history_is_paginated(tag_index, source, fake_github):
+    assert source.list_versions(limit=0) == ["0.55.1", "0.55.0", "0.54.0", "0.9.0"]
+    assert len(_tag_requests(fake_github)) == 3
+
+
+def test_listing_reads_the_local_index(tag_index, source, fake_github):
+    source.list_versions()
+    assert source.list_versions(limit=2) == ["0.55.1", "0.55.0"]
+    assert len(_tag_requests(fake_github)) == 3
+
+
+def test_unchanged_refresh_is_conditional(tag_index, source, fake_github):
+    source.list_versions()
+    source.list_versions(refresh=True)
+
+    requests = _tag_requests(fake_github)
+    assert len(requests) == 4
+    assert requests[-1]["If-None-Match"]
+
+
+def test_refresh_stops_at_first_known_tag(tag_index, source, fake_github):
+    source.list_versions()
+    fake_github.tags.insert(0, "v0.56.0")
+
+    assert source.list_versions(limit=1, refresh=True) == ["0.56.0"]
+    assert len(_tag_requests(fake_github)) == 4
+    assert tag_index.get("tags")["tags"][:2] == ["v0.56.0", "v0.55.1"]
+
+
+def test_refresh_falls_back_to_index(tag_index, source, fake_github):
+    source.list_versions()
+    fake_github.stop()
+
+    assert source.list_versions(limit=1, refresh=True) == ["0.55.1"]
+
+
+def test_token_goes_to_the_api_only(tag_index, fake_github):
+    source = remote.GitHubSource(fake_github.repo_url, fake_github.api_url, "secret")
+    fake_github.tags = ["v0.55.1"]
+    source.list_versions()
+    source.resolve("latest")
+
+    auth = {
+        r["path"].split("?")[0]: r.get("Authorization") for r in fake_github.requests
+    }
+    assert auth == {
+        "/repos/gruntwork-io/terragrunt/tags": "Bearer secret",
+        "/gruntwork-io/terragrunt/releases/latest": None,
+    }
+
+
+def test_github_token_default(monkeypatch):
+    monkeypatch.setattr(remote, "GITHUB_TOKEN", "secret")
+    assert remote.GitHubSource().token == "secret"
+    assert remote.GitHubSource("http://mirror", "http://mirror/api").token == ""
+    assert remote.MirrorSource("http://mirror").token == ""
+
+
+def test_low_budget_uses_index(tag_index, source, fake_github, rate_limits):
+    fake_github.rate_limit = 12
+    fake_github.rate_limit_reset = time.time() + 3600
+    source.list_versions()
+    host = fake_github.url.split("://")[1]
+    assert rate_limits.remaining(host) == 9
+
+    fake_github.tags.insert(0, "v0.56.0")
+    assert source.list_versions(limit=1, refresh=True) == ["0.55.1"]
+    assert len(_tag_requests(fake_github)) == 3
+
+
+def test_exhausted_budget_is_not_spent(tag_index, source, fake_github):
+    fake_github.rate_limit = 0
+    fake_github.rate_limit_reset = time.time() + 3600
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        source.list_versions()
+    assert e.value.code == 403
+    with pytest.raises(remote.RateLimited):
+        source.list_versions()
+    assert len(_tag_requests(fake_github)) == 1
+
+
+def test_rate_limit_expires(tag_index, source, fake_github, rate_limits):
+    host = fake_github.url.split("://")[1]
+    rate_limits.cache.set(host, {"remaining": 0, "reset": time.time() - 1})
+    assert source.list_versions(limit=1) == ["0.55.1"]
+
+
+def test_retry_after_pauses_host(source, fake_github, rate_limits):
+    fake_github.fail(429, count=10)
+    fake_github.retry_after = "120"
+
+    with pytest.raises(urllib.error.HTTPError):
+        source.resolve("0.55.1")
+    assert len(fake_github.requests) == 1
+    with pytest.raises(remote.RateLimited):
+        source.resolve("0.55.0")
+    assert len(fake_github.requests) == 1
+
+
+def test_resolve_falls_back_to_index(tag_index, source, fake_github):
+    source.list_versions()
+    fake_github.fail(503, count=100, path="/gruntwork-io/terragrunt/releases/")
+
+    assert source.resolve("latest") == "0.55.1"
+    assert source.resolve("0.54.0") == "0.54.0"
+    with pytest.raises(urllib.error.HTTPError):
+        source.resolve("0.56.0")
+
+
+def test_transient_errors_are_retried(source, fake_github):
+    fake_github.fail(502, count=2)
+    assert source.resolve("latest") == "0.55.1"
+    assert len(fake_github.requests) == 3
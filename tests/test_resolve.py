@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from terragrunt_env import resolve
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(resolve, "VERSION_FILE_MEMO_DIR", tmp_path / "memo")
+    monkeypatch.setattr(resolve, "TGENV_ROOT", tmp_path / "root")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    module = tmp_path / "repo" / "live" / "prod" / "vpc"
+    module.mkdir(parents=True)
+    (tmp_path / "home").mkdir()
+    (tmp_path / "repo" / ".terragrunt-version").write_text("0.55.1\n")
+    monkeypatch.chdir(module)
+    return tmp_path
+
+
+def test_walks_up_parent_directories(tree):
+    assert resolve.get_version_file() == tree / "repo" / ".terragrunt-version"
+    assert resolve.get_version_from_file() == "0.55.1"
+
+
+def test_nearest_file_wins(tree):
+    (tree / "repo" / "live" / ".terragrunt-version").write_text("0.54.0\n")
+    assert resolve.get_version_from_file() == "0.54.0"
+
+
+def test_falls_back_to_home(tree):
+    (tree / "repo" / ".terragrunt-version").unlink()
+    (tree / "home" / ".terragrunt-version").write_text("0.50.0\n")
+    assert resolve.get_version_from_file() == "0.50.0"
+
+
+def test_memo_hit_skips_walk(tree, mocker):
+    resolve.get_version_file()
+    walk = mocker.spy(resolve, "_walk_version_files")
+
+    assert resolve.get_version_file() == tree / "repo" / ".terragrunt-version"
+    walk.assert_not_called()
+
+
+def test_memo_invalidated_by_directory_change(tree):
+    resolve.get_version_file()
+    local = tree / "repo" / "live" / "prod" / "vpc" / ".terragrunt-version"
+    local.write_text("0.56.0\n")
+    os.utime(local.parent, ns=(0, 0))
+
+    assert resolve.get_version_file() == local
+
+
+def test_memo_invalidated_by_removed_file(tree):
+    resolve.get_version_file()
+    (tree / "repo" / ".terragrunt-version").unlink()
+
+    assert resolve.get_version_file() is None
+
+
+def test_memo_expires(tree, mocker):
+    resolve.get_version_file()
+    (tree / "repo" / "live" / ".terragrunt-version").write_text("0.54.0\n")
+    assert resolve.get_version_from_file() == "0.55.1"
+
+    mocker.patch("time.time", return_value=10**10)
+    assert resolve.get_version_from_file() == "0.54.0"
+
+
+def test_clear_memo(tree):
+    resolve.get_version_file()
+    (tree / "repo" / "live" / ".terragrunt-version").write_text("0.54.0\n")
+    resolve.clear_version_file_memo()
+
+    assert resolve.get_version_from_file() == "0.54.0"
+
+
+def test_memo_is_pruned(tree, monkeypatch, mocker):
+    monkeypatch.setattr(resolve, "VERSION_FILE_MEMO_MAX", 8)
+    for i in range(12):
+        (tree / "repo" / f"job-{i}").mkdir()
+        resolve.find_version_file(tree / "repo" / f"job-{i}")
+
+    assert len(list(resolve.VERSION_FILE_MEMO_DIR.iterdir())) == 7
+    walk = mocker.spy(resolve, "_walk_version_files")
+    resolve.find_version_file(tree / "repo" / "job-11")
+    walk.assert_not_called()
@@ -0,0 +1,176 @@
+import json
+import time
+import urllib.error
+
+import pytest
+from fake_github import FakeGitHub
+
+from terragrunt_env import download, remote, session, tracing
+from terragrunt_env.cache import Cache
+
+
+@pytest.fixture
+def http():
+    s = session.Session()
+    yield s
+    s.clear()
+
+
+@pytest.fixture
+def source(fake_github, tmp_path, monkeypatch):
+    monkeypatch.setattr(remote, "RESOLUTION_CACHE", Cache(tmp_path / "r.json", 60))
+    fake_github.tags = ["v0.56.0", "v0.55.1"]
+    return remote.GitHubSource(fake_github.repo_url, fake_github.api_url)
+
+
+def test_connection_is_reused(http, fake_github):
+    url = fake_github.add_asset("/asset", b"x" * 100)
+    for _ in range(3):
+        with http.request("GET", url) as response:
+            assert response.read() == b"x" * 100
+    assert fake_github.connections == 1
+
+
+def test_http_span_reports_status_and_bytes(http, fake_github, tmp_path, monkeypatch):
+    trace = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(tracing, "_trace_target", str(trace))
+    url = fake_github.add_asset("/asset", b"x" * 100)
+    with http.request("GET", url) as response:
+        response.read()
+
+    (record,) = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert (record["span"], record["status"], record["bytes"]) == ("http", 200, 100)
+
+
+def test_unread_response_is_not_pooled(http, fake_github):
+    url = fake_github.add_asset("/asset", b"x" * 100)
+    http.request("GET", url).close()
+    with http.request("GET", url) as response:
+        assert response.read() == b"x" * 100
+    assert fake_github.connections == 2
+
+
+def test_idle_connection_dropped_by_server(http, fake_github):
+    fake_github.drop_idle = True
+    url = fake_github.add_asset("/asset", b"x" * 100)
+    for _ in range(2):
+        with http.request("GET", url) as response:
+            assert response.read() == b"x" * 100
+    assert fake_github.connections == 2
+
+
+def test_error_status_raises_http_error(http, fake_github):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        http.request("GET", f"{fake_github.url}/missing")
+    assert e.value.code == 404
+
+
+def test_connection_refused_raises_url_error(http, fake_github):
+    url = fake_github.url
+    fake_github.stop()
+    with pytest.raises(urllib.error.URLError):
+        http.request("GET", url)
+
+
+def test_latest_is_resolved_with_head(source, fake_github):
+    assert source.resolve("latest") == "0.56.0"
+    assert source.resolve("0.55.1") == "0.55.1"
+    assert source.resolve("0.1.0") is None
+    assert {r["method"] for r in fake_github.requests} == {"HEAD"}
+
+
+def test_resolve_and_download_share_a_connection(
+    source, fake_github, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(remote, "SESSION", session.Session())
+    monkeypatch.setattr(download, "SESSION", remote.SESSION)
+    url = fake_github.add_asset("/asset", b"x" * 100)
+
+    source.resolve("latest")
+    download.fetch(url, tmp_path / "terragrunt", segments=1)
+    assert fake_github.connections == 1
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(session, "BACKOFF_BASE", 0)
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_transient_errors_are_retried(http, fake_github, no_backoff, status):
+    url = fake_github.add_asset("/asset", b"x")
+    fake_github.fail(status, count=2)
+    with http.request("GET", url, retries=2) as response:
+        assert response.read() == b"x"
+    assert len(fake_github.requests) == 3
+
+
+def test_retries_are_exhausted(http, fake_github, no_backoff):
+    url = fake_github.add_asset("/asset", b"x")
+    fake_github.fail(503, count=5)
+    with pytest.raises(urllib.error.HTTPError) as e:
+        http.request("GET", url, retries=2)
+    assert e.value.code == 503
+    assert len(fake_github.requests) == 3
+
+
+def test_client_errors_are_not_retried(http, fake_github, no_backoff):
+    with pytest.raises(urllib.error.HTTPError):
+        http.request("GET", fake_github.url + "/missing", retries=3)
+    assert len(fake_github.requests) == 1
+
+
+def test_long_retry_after_is_not_waited_for(http, fake_github, no_backoff):
+    url = fake_github.add_asset("/asset", b"x")
+    fake_github.fail(429)
+    fake_github.retry_after = "3600"
+    with pytest.raises(urllib.error.HTTPError) as e:
+        http.request("GET", url, retries=3)
+    assert e.value.headers["Retry-After"] == "3600"
+    assert len(fake_github.requests) == 1
+
+
+@pytest.mark.parametrize(
+    "status,headers,low,high",
+    [
+        (429, {"Retry-After": "2"}, 2, 2.5),
+        (503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0, 0.5),
+        (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "+5"}, 4, 5.5),
+        (500, {}, 0, 2),
+    ],
+)
+def test_retry_delay(status, headers, low, high):
+    if headers.get("X-RateLimit-Reset") == "+5":
+        headers["X-RateLimit-Reset"] = str(time.time() + 5)
+    assert low <= session.retry_delay(2, status, headers) <= high
+
+
+@pytest.mark.parametrize(
+    "status,headers",
+    [
+        (403, {}),
+        (404, {"Retry-After": "1"}),
+        (429, {"Retry-After": "3600"}),
+        (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "9999999999"}),
+    ],
+)
+def test_not_retried(status, headers):
+    assert session.retry_delay(0, status, headers) is None
+
+
+def test_authorization_stays_on_its_host(http, fake_github):
+    other = FakeGitHub().start()
+    try:
+        url = other.add_asset("/asset", b"x")
+        fake_github.redirects["/download"] = url
+        fake_github.redirects["/local"] = fake_github.url + "/download"
+        headers = {"Authorization": "Bearer secret"}
+        with http.request("GET", fake_github.url + "/local", headers) as response:
+            assert response.read() == b"x"
+    finally:
+        other.stop()
+    assert [r.get("Authorization") for r in fake_github.requests] == [
+        "Bearer secret",
+        "Bearer secret",
+    ]
+    assert other.requests[0].get("Authorization") is None
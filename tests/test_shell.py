@@ -0,0 +1,138 @@
+import shlex
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from terragrunt_env import resolve, shell
+
+COMMANDS = {
+    "bash": ["bash", "--norc", "-c"],
+    "zsh": ["zsh", "-f", "-c"],
+    "fish": ["fish", "--no-config", "-c"],
+}
+# fish keeps PATH as a list.
+SHOW_PATH = {"fish": "string join : $PATH"}
+
+
+@pytest.fixture(
+    params=[
+        pytest.param(
+            name,
+            marks=pytest.mark.skipif(
+                shutil.which(name) is None, reason=f"needs {name}"
+            ),
+        )
+        for name in shell.SHELLS
+    ]
+)
+def sh(request):
+    return request.param
+
+
+@pytest.fixture
+def home(tmp_path, versions_dir, monkeypatch):
+    monkeypatch.setattr(shell, "TGENV_ROOT", tmp_path / "root")
+    for v in ["0.54.0", "0.55.1"]:
+        path = resolve.get_version_path(v)
+        path.parent.mkdir(parents=True)
+        path.write_text("#!/bin/sh\necho " + v + "\n")
+        path.chmod(0o755)
+    resolve.get_manifest().rebuild()
+
+    # A stand-in for `tgenv which` that records each call.
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tgenv = bin_dir / "tgenv"
+    tgenv.write_text(
+        f'#!/bin/sh\necho "$*" >> {tmp_path}/calls\n'
+        f"echo {resolve.get_version_path('0.55.1')}\n"
+    )
+    tgenv.chmod(0o755)
+
+    for directory, pin in {"a": "0.55.1", "b": "0.54.0", "c": "~> 0.55.0"}.items():
+        (tmp_path / "home" / directory / "sub").mkdir(parents=True)
+        (tmp_path / "home" / directory / resolve.VERSION_FILE_NAME).write_text(
+            pin + "\n"
+        )
+    return tmp_path
+
+
+def run(home, script, sh="bash"):
+    env = {"HOME": str(home / "home"), "PATH": f"{home}/bin:/usr/bin:/bin"}
+    script = script.replace("echo $PATH", SHOW_PATH.get(sh, "echo $PATH"))
+    result = subprocess.run(
+        [*COMMANDS[sh], shell.hook(sh) + script],
+        env=env,
+        cwd=home / "home",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.splitlines()
+
+
+def _calls(home):
+    try:
+        return (home / "calls").read_text().splitlines()
+    except FileNotFoundError:
+        return []
+
+
+def calls(home):
+    # `tgenv which` runs that resolved a version for the hook.
+    return _calls(home).count("which --touch")
+
+
+def touched(home, version):
+    # Touches for an exact pin run in the background.
+    deadline = time.monotonic() + 5
+    while f"which --touch {version}" not in _calls(home):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_installed_version_goes_on_path(home, sh):
+    out = run(home, "cd a/sub; _tgenv_hook; terragrunt; echo $PATH", sh)
+    assert out[0] == "0.55.1"
+    assert out[1].startswith(f"{resolve.VERSIONS_DIR}/0.55.1:")
+    assert calls(home) == 0
+    assert touched(home, "0.55.1")
+
+
+def test_switching_directories_replaces_entry(home, sh):
+    out = run(
+        home,
+        "cd a; _tgenv_hook; cd ../b/sub; _tgenv_hook; terragrunt; echo $PATH;"
+        "cd ../..; _tgenv_hook; echo $PATH",
+        sh,
+    )
+    assert out[0] == "0.54.0"
+    assert out[1] == f"{resolve.VERSIONS_DIR}/0.54.0:{home}/bin:/usr/bin:/bin"
+    assert out[2] == f"{home}/bin:/usr/bin:/bin"
+
+
+def test_constraint_is_resolved_once_per_change(home, sh):
+    script = "cd c; _tgenv_hook; _tgenv_hook; cd sub; _tgenv_hook; terragrunt"
+    assert run(home, script, sh) == ["0.55.1"]
+    assert calls(home) == 1
+
+    resolve.get_manifest().remove("0.54.0")
+    run(home, "cd c; _tgenv_hook; _tgenv_hook", sh)
+    assert calls(home) == 2
+
+
+def test_preserves_exit_status(home, sh):
+    if sh == "fish":
+        pytest.skip("fish restores $status itself")
+    assert run(home, "cd a; (exit 3); _tgenv_hook; echo $?", sh) == ["3"]
+
+
+@pytest.mark.parametrize("name", shell.SHELLS)
+def test_hook_quotes_paths(name, home, monkeypatch):
+    versions_dir = home / "it's here" / "versions"
+    monkeypatch.setattr(resolve, "VERSIONS_DIR", versions_dir)
+    assert shlex.quote(str(versions_dir)) in shell.hook(name)
@@ -0,0 +1,131 @@
+import errno
+import hashlib
+import os
+
+import pytest
+
+from terragrunt_env import helper, location, remote, resolve, settings, store
+
+DATA = b"terragrunt" * 1000
+DIGEST = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def root(tmp_path, versions_dir):
+    return tmp_path
+
+
+def _download(version):
+    path = resolve.get_version_path(version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(DATA)
+    helper.save_digest(path, DIGEST)
+    store.publish(path, DIGEST)
+    return path
+
+
+def test_publish_links_binary_into_store(root):
+    path = _download("0.55.1")
+    obj = resolve.get_object_path(DIGEST)
+    assert obj == root / "objects" / DIGEST
+    assert os.path.samefile(path, obj)
+    assert obj.stat().st_nlink == 2
+
+
+def test_identical_binaries_share_one_copy(root):
+    a = _download("0.55.1")
+    b = _download("0.55.1-rebuild")
+    assert os.path.samefile(a, b)
+    assert a.stat().st_nlink == 3
+
+
+def test_restore_avoids_download(root):
+    _download("0.55.1")
+    path = resolve.get_version_path("0.55.2")
+    path.parent.mkdir(parents=True)
+
+    assert store.restore(DIGEST, path)
+    assert path.read_bytes() == DATA
+    assert not store.restore("0" * 64, path.with_name("other"))
+
+
+def test_release_removes_unreferenced_object(root):
+    _download("0.55.1")
+    _download("0.55.2")
+    obj = resolve.get_object_path(DIGEST)
+
+    assert helper.uninstall_version("0.55.1")
+    assert obj.exists()
+    assert helper.uninstall_version("0.55.2")
+    assert not obj.exists()
+
+
+def test_objects_dir_shared_between_roots(root, monkeypatch):
+    monkeypatch.setattr(resolve, "TGENV_OBJECTS_DIR", str(root / "objects"))
+    a = _download("0.55.1")
+    monkeypatch.setattr(resolve, "VERSIONS_DIR", root / "b" / "versions")
+    b = resolve.get_version_path("0.55.1")
+    b.parent.mkdir(parents=True)
+
+    assert store.restore(DIGEST, b)
+    assert os.path.samefile(a, b)
+
+
+def test_falls_back_to_copy_without_hard_links(root, monkeypatch):
+    src = root / "src"
+    src.write_bytes(DATA)
+    src.chmod(0o755)
+
+    def no_links(*args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", no_links)
+    store.link(src, root / "dst")
+
+    assert (root / "dst").read_bytes() == DATA
+    assert not os.path.samefile(src, root / "dst")
+    assert (root / "dst").stat().st_mode & 0o777 == 0o755
+
+
+def test_install_restores_from_store(root, monkeypatch, mocker):
+    _download("0.55.1")
+    monkeypatch.setattr(helper, "_OS", "linux")
+    monkeypatch.setattr(helper, "detect_arch", lambda: "amd64")
+    source = mocker.patch.object(remote, "SOURCE")
+    source.checksums.return_value = {"terragrunt_linux_amd64": DIGEST}
+    fetch = mocker.patch.object(helper, "fetch")
+
+    path = helper.install_version("0.55.2")
+
+    fetch.assert_not_called()
+    assert path.read_bytes() == DATA
+    assert helper.get_digest("0.55.2") == DIGEST
+    assert resolve.get_manifest().load()["0.55.2"].sha256 == DIGEST
+
+
+def test_shared_store_permissions(root, monkeypatch):
+    monkeypatch.setattr(helper, "TGENV_SHARED", True)
+    monkeypatch.setattr(helper, "TGENV_ROOT", root / "a")
+    monkeypatch.setattr(helper, "VERSIONS_DIR", root / "a" / "versions")
+    umask = os.umask(0o022)
+    try:
+        helper.prepare_store()
+        assert os.umask(0o022) == 0o002
+    finally:
+        os.umask(umask)
+    assert (root / "a").stat().st_mode & 0o2070 == 0o2070
+    assert (root / "a" / "versions").stat().st_mode & 0o2070 == 0o2070
+
+
+def test_root_location(monkeypatch, tmp_path):
+    monkeypatch.delenv("TGENV_ROOT", raising=False)
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    assert location.tgenv_root() == str(tmp_path / "data" / "tgenv")
+
+    monkeypatch.delenv("XDG_DATA_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert location.tgenv_root() == str(tmp_path / ".local" / "share" / "tgenv")
+
+    monkeypatch.setenv("TGENV_ROOT", "~/store")
+    assert location.tgenv_root() == str(tmp_path / "store")
+    assert settings.TGENV_ROOT.is_absolute()
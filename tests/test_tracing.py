@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from terragrunt_env import download, tracing
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(tracing, "_trace_target", str(path))
+    return path
+
+
+@pytest.fixture
+def metrics_file(tmp_path, monkeypatch):
+    path = tmp_path / "tgenv.prom"
+    monkeypatch.setattr(tracing, "_metrics_file", str(path))
+    monkeypatch.setattr(tracing, "_counters", {})
+    return path
+
+
+def _spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_disabled_tracing_is_a_no_op(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_trace_target", "")
+    with tracing.span("resolve") as span:
+        span.set(version="0.55.1")
+    assert span is tracing._NULL_SPAN
+
+
+def test_span_written_as_json_line(trace_file):
+    with tracing.span("resolve", requested="latest") as span:
+        span.set(version="0.55.1")
+
+    (record,) = _spans(trace_file)
+    assert record["span"] == "resolve"
+    assert record["requested"] == "latest"
+    assert record["version"] == "0.55.1"
+    assert record["duration"] >= 0
+
+
+def test_span_records_errors(trace_file):
+    with pytest.raises(KeyError):
+        with tracing.span("http"):
+            raise KeyError("boom")
+    assert "boom" in _spans(trace_file)[0]["error"]
+
+
+def test_download_span_reports_throughput(trace_file, metrics_file, tmp_path):
+    source = tmp_path / "source"
+    source.write_bytes(b"x" * 1000)
+    download.fetch(source.as_uri(), tmp_path / "terragrunt")
+
+    (record,) = _spans(trace_file)
+    assert record["span"] == "download"
+    assert record["bytes"] == 1000
+    assert tracing._counters["tgenv_download_bytes_total"] == 1000
+
+
+def test_metrics_merge_with_existing_textfile(metrics_file):
+    metrics_file.write_text(
+        "# TYPE tgenv_shim_execs_total counter\ntgenv_shim_execs_total 2\n"
+    )
+    tracing.incr("tgenv_shim_execs_total")
+    tracing.incr("tgenv_cache_lookups_total", cache="tags", result="hit")
+    tracing.flush_metrics()
+
+    assert metrics_file.read_text().splitlines() == [
+        "# TYPE tgenv_cache_lookups_total counter",
+        'tgenv_cache_lookups_total{cache="tags",result="hit"} 1',
+        "# TYPE tgenv_shim_execs_total counter",
+        "tgenv_shim_execs_total 3",
+    ]
+    assert tracing._counters == {}
+
+
+def test_metrics_keep_full_precision(metrics_file):
+    for _ in range(2):
+        tracing.incr("tgenv_download_bytes_total", 83886081)
+        tracing.incr("tgenv_shim_seconds_total", 0.1234567891)
+        tracing.flush_metrics()
+    metrics_file.write_text(
+        metrics_file.read_text() + "tgenv_shim_execs_total 1000000\n"
+    )
+    tracing.incr("tgenv_shim_execs_total")
+    tracing.flush_metrics()
+
+    lines = metrics_file.read_text().splitlines()
+    assert "tgenv_download_bytes_total 167772162" in lines
+    assert "tgenv_shim_execs_total 1000001" in lines
+    assert "tgenv_shim_seconds_total 0.2469135782" in lines
+
+
+def test_flush_is_registered_once(metrics_file, monkeypatch, mocker):
+    monkeypatch.setattr(tracing, "_flush_registered", False)
+    register = mocker.patch("atexit.register")
+    for _ in range(3):
+        tracing.incr("tgenv_shim_execs_total")
+        tracing.flush_metrics()
+    register.assert_called_once_with(tracing.flush_metrics)
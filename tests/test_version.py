@@ -322,3 +322,87 @@ def test_not_equals(version1, version2, expected):
     v1 = version.Version(version1)
     v2 = version.Version(version2)
     assert (v1 != v2) is expected
+
+
+@pytest.mark.parametrize(
+    "test_input,expected",
+    [
+        ("1.2.3", (1, 2, 3)),
+        ("v1.2.3", (1, 2, 3)),
+        ("V1.2", (1, 2)),
+        ("1", (1,)),
+        (" 1.2.3 ", None),
+        ("1..2", None),
+        ("1.2.", None),
+        ("1.2.3-rc1", None),
+        ("1.²", None),
+        ("", None),
+    ],
+)
+def test_parse_release_fast_path(test_input, expected):
+    assert version._parse_release(test_input) == expected
+
+
+def test_interned():
+    assert version.Version("1.2.3") is version.Version("1.2.3")
+    assert version.Version("1.2.3") is not version.Version("v1.2.3")
+
+
+def test_slots():
+    with pytest.raises(AttributeError):
+        version.Version("1.2.3").extra = 1
+
+
+def test_parse_many():
+    assert version.Version.parse_many(["1.2.3", "v1.2.4"]) == [
+        version.Version("1.2.3"),
+        version.Version("1.2.4"),
+    ]
+    assert version.Version.parse_many(["1.2.3", "x"], strict=False) == [
+        version.Version("1.2.3")
+    ]
+    with pytest.raises(version.InvalidVersion):
+        version.Version.parse_many(["1.2.3", "x"])
+
+
+def test_sort_versions():
+    versions = ["0.9.0", "x", "0.10.0", "0.10.0-beta1", "0.10.0-rc1", "0.9.0-r1"]
+    assert version.sort_versions(versions) == [
+        "0.9.0",
+        "0.9.0-r1",
+        "0.10.0-beta1",
+        "0.10.0-rc1",
+        "0.10.0",
+    ]
+    assert version.sort_versions(versions, reverse=True)[0] == "0.10.0"
+
+
+def test_cmpkey_is_native():
+    key = version.Version("1.2.0rc1.post2.dev3")._key
+    assert key == ((1, 2), 2, 1, 2, 0, 3)
+    assert all(type(part) is int for part in key[1:])
+
+
+def test_sort_order_of_suffixes():
+    versions = [
+        "1.0",
+        "1.0.dev1",
+        "1.0a1.dev1",
+        "1.0a1",
+        "1.0b2.post1",
+        "1.0rc1",
+        "1.0.post0.dev1",
+        "1.0.post0",
+        "1.0.post1",
+    ]
+    assert version.sort_versions(versions) == [
+        "1.0.dev1",
+        "1.0a1.dev1",
+        "1.0a1",
+        "1.0b2.post1",
+        "1.0rc1",
+        "1.0",
+        "1.0.post0.dev1",
+        "1.0.post0",
+        "1.0.post1",
+    ]